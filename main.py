@@ -1,6 +1,6 @@
 """Entry point for the homelab Discord bot."""
 
-from src import config
+from src import config, vote_store
 from src.bot import bot
 
 # Load extensions (registers commands)
@@ -20,6 +20,8 @@ def main():
         return
     if config.MEDIA_VOTES_DRY_RUN:
         print("⚠️  Media votes DRY RUN enabled - no files will be deleted")
+    vote_store.import_legacy_json()
+    vote_store.import_legacy_proposed_json()
     bot.run(config.TOKEN)
 
 
@@ -0,0 +1,109 @@
+"""Cached, indexed Radarr/Sonarr libraries for O(1) lookups by TMDB/TVDB id."""
+
+import asyncio
+import time
+from typing import Dict, Optional
+
+from . import http_client
+from .config import (
+    ARR_CATALOG_TTL_SECONDS,
+    RADARR_API_KEY,
+    RADARR_URL,
+    SONARR_API_KEY,
+    SONARR_URL,
+)
+from .resilience import CircuitBreaker, CircuitOpenError, radarr_breaker, sonarr_breaker
+
+
+class ArrCatalog:
+    """One *arr library (Radarr movies or Sonarr series) indexed by an external id.
+
+    The full list is downloaded once and re-fetched after ttl seconds; concurrent
+    lookups during a refresh wait for the same download instead of starting their own.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        base_url: Optional[str],
+        api_key: Optional[str],
+        resource: str,
+        id_field: str,
+        breaker: CircuitBreaker,
+    ):
+        self.name = name
+        self.breaker = breaker
+        self.base_url = base_url
+        self.api_key = api_key
+        self.resource = resource
+        self.id_field = id_field
+        self._by_external_id: Dict[int, dict] = {}
+        self._fetched_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.base_url and self.api_key)
+
+    def _is_fresh(self) -> bool:
+        return self._fetched_at is not None and time.monotonic() - self._fetched_at < ARR_CATALOG_TTL_SECONDS
+
+    async def refresh(self):
+        """Download the full library and rebuild the index."""
+        url = f"{self.base_url.rstrip('/')}/api/v3/{self.resource}"
+        headers = {"X-Api-Key": self.api_key}
+        async with http_client.get_session().get(url, headers=headers) as resp:
+            if resp.status >= 500:
+                resp.raise_for_status()
+            if resp.status != 200:
+                print(f"Error fetching {self.name} catalog: {resp.status}")
+                return
+            data = await resp.json()
+        self._by_external_id = {item[self.id_field]: item for item in data if item.get(self.id_field)}
+        self._fetched_at = time.monotonic()
+
+    async def get(self, external_id: int) -> Optional[dict]:
+        """Return the library entry for a TMDB/TVDB id, refreshing the cache if it is stale.
+
+        If the backend is down, stale entries are served; with nothing cached the error
+        (CircuitOpenError while the circuit is open) is raised.
+        """
+        if not self.configured:
+            return None
+        if not self._is_fresh():
+            async with self._lock:
+                if not self._is_fresh():
+                    try:
+                        await self.breaker.call(self.refresh)
+                    except Exception as e:
+                        if self._fetched_at is None:
+                            raise
+                        if not isinstance(e, CircuitOpenError):
+                            print(f"Error refreshing {self.name} catalog, serving cached copy: {e}")
+        return self._by_external_id.get(external_id)
+
+    def invalidate(self, arr_id: Optional[int] = None):
+        """Forget one entry by its Radarr/Sonarr id (e.g. after a delete), or the whole cache."""
+        if arr_id is None:
+            self._fetched_at = None
+            return
+        for external_id, item in list(self._by_external_id.items()):
+            if item.get("id") == arr_id:
+                del self._by_external_id[external_id]
+
+
+def size_on_disk_gb(entry: dict) -> Optional[float]:
+    """Disk usage of a Radarr movie (sizeOnDisk) or Sonarr series (statistics.sizeOnDisk), in GB.
+
+    Counts every file the *arr manages, i.e. what deleting it actually frees. None if not reported.
+    """
+    size = entry.get("sizeOnDisk")
+    if size is None:
+        size = (entry.get("statistics") or {}).get("sizeOnDisk")
+    if size is None:
+        return None
+    return size / (1024**3)
+
+
+radarr_catalog = ArrCatalog("Radarr", RADARR_URL, RADARR_API_KEY, "movie", "tmdbId", radarr_breaker)
+sonarr_catalog = ArrCatalog("Sonarr", SONARR_URL, SONARR_API_KEY, "series", "tvdbId", sonarr_breaker)
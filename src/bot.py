@@ -1,9 +1,15 @@
 """Discord bot instance and command tree."""
 
+import asyncio
 import discord
 import logging
+import signal
 from discord.ext import commands
 
+from . import http_client, plex_client, vote_store
+from .state_store import flush_state_store, state
+from .vote_store import flush_vote_store
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -15,6 +21,33 @@ logger.setLevel(logging.DEBUG)
 
 logger.info("Bot starting up...")
 
+
+class HomelabBot(commands.Bot):
+    """Bot that owns the shared HTTP session, Plex thread pool and write-behind loops for its whole lifetime."""
+
+    async def setup_hook(self):
+        http_client.get_session()
+        # Write-behind loops start before anything in on_ready can fail, so no change stays memory-only
+        if not flush_state_store.is_running():
+            flush_state_store.start()
+        if not flush_vote_store.is_running():
+            flush_vote_store.start()
+        # Docker stops the container with SIGTERM; close cleanly so buffered writes reach disk
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, lambda: asyncio.create_task(self.close()))
+        except NotImplementedError:
+            pass
+
+    async def close(self):
+        await super().close()
+        await http_client.close()
+        plex_client.shutdown()
+        flush_state_store.cancel()
+        flush_vote_store.cancel()
+        vote_store.close()
+        state.flush()
+
+
 intents = discord.Intents.all()
-bot = commands.Bot(command_prefix="!", intents=intents)
+bot = HomelabBot(command_prefix="!", intents=intents)
 tree = bot.tree
@@ -12,21 +12,53 @@ TEST_GUILD_ID = int(os.getenv("TEST_GUILD_ID")) if os.getenv("TEST_GUILD_ID") el
 # Plex
 PLEX_URL = os.getenv("PLEX_URL")
 PLEX_TOKEN = os.getenv("PLEX_TOKEN")
+# Threads running blocking plexapi calls (bounds concurrent Plex requests)
+PLEX_EXECUTOR_WORKERS = int(os.getenv("PLEX_EXECUTOR_WORKERS", "4"))
+# Items per request when listing Plex libraries in bulk
+PLEX_PAGE_SIZE = int(os.getenv("PLEX_PAGE_SIZE", "500"))
+# How often the /media_stats snapshot is recomputed in the background
+MEDIA_STATS_REFRESH_MINUTES = int(os.getenv("MEDIA_STATS_REFRESH_MINUTES", "30"))
 
 # Overseerr
 OVERSEERR_URL = os.getenv("OVERSEERR_URL", "https://overseer.tessdev.fr")
 OVERSEERR_API_KEY = os.getenv("OVERSEERR_API_KEY")
+OVERSEERR_PAGE_SIZE = int(os.getenv("OVERSEERR_PAGE_SIZE", "100"))
+OVERSEERR_PAGE_CONCURRENCY = int(os.getenv("OVERSEERR_PAGE_CONCURRENCY", "4"))
+OVERSEERR_PAGE_RETRIES = int(os.getenv("OVERSEERR_PAGE_RETRIES", "2"))
+
+# Outbound HTTP (shared session for Overseerr / Radarr / Sonarr)
+HTTP_TIMEOUT_SECONDS = int(os.getenv("HTTP_TIMEOUT_SECONDS", "30"))
+HTTP_CONNECT_TIMEOUT_SECONDS = int(os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", "10"))
+HTTP_LIMIT_PER_HOST = int(os.getenv("HTTP_LIMIT_PER_HOST", "10"))
+HTTP_DNS_CACHE_SECONDS = int(os.getenv("HTTP_DNS_CACHE_SECONDS", "300"))
+
+# Circuit breakers (fail fast while a backend is down)
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "3"))
+CIRCUIT_BASE_BACKOFF_SECONDS = int(os.getenv("CIRCUIT_BASE_BACKOFF_SECONDS", "30"))
+CIRCUIT_MAX_BACKOFF_SECONDS = int(os.getenv("CIRCUIT_MAX_BACKOFF_SECONDS", "600"))
 
 # Radarr / Sonarr (for media deletion)
 RADARR_URL = os.getenv("RADARR_URL")
 RADARR_API_KEY = os.getenv("RADARR_API_KEY")
 SONARR_URL = os.getenv("SONARR_URL")
 SONARR_API_KEY = os.getenv("SONARR_API_KEY")
+ARR_CATALOG_TTL_SECONDS = int(os.getenv("ARR_CATALOG_TTL_SECONDS", "900"))
 VOTE_DURATION_DAYS = int(os.getenv("VOTE_DURATION_DAYS", "7"))
 AUTO_VOTE_UNWATCHED_DAYS = int(os.getenv("AUTO_VOTE_UNWATCHED_DAYS", "90"))
+# Months after which an already-proposed item may be proposed again (0 = never)
+AUTO_VOTE_REPROPOSE_MONTHS = int(os.getenv("AUTO_VOTE_REPROPOSE_MONTHS", "0"))
+# Votes per round, and how candidates are ranked: "feature=weight,..." over
+# size_gb, days_since_viewed (since added if never watched), days_since_added, view_count
+AUTO_VOTE_ROUND_SIZE = int(os.getenv("AUTO_VOTE_ROUND_SIZE", "5"))
+AUTO_VOTE_SCORE_WEIGHTS = os.getenv(
+    "AUTO_VOTE_SCORE_WEIGHTS", "size_gb=1,days_since_viewed=0.1,days_since_added=0.02,view_count=-5"
+)
 VOTE_CHANNEL_ID = int(os.getenv("VOTE_CHANNEL_ID", "0")) or None
 VOTE_MENTION_ROLE_ID = int(os.getenv("VOTE_MENTION_ROLE_ID", "0")) or None
 MEDIA_VOTES_DRY_RUN = os.getenv("MEDIA_VOTES_DRY_RUN", "").lower() in ("1", "true", "yes")
+VOTE_ENRICH_CONCURRENCY = int(os.getenv("VOTE_ENRICH_CONCURRENCY", "4"))
+VOTE_FLUSH_INTERVAL_SECONDS = int(os.getenv("VOTE_FLUSH_INTERVAL_SECONDS", "5"))
+VOTE_JOURNAL_RETENTION_DAYS = int(os.getenv("VOTE_JOURNAL_RETENTION_DAYS", "365"))
 
 # File paths - use project root (parent of src/) for data/
 _BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -34,8 +66,12 @@ DASHBOARD_STATE_FILE = os.path.join(_BASE_DIR, "data", "dashboard_state.json")
 COUNTER_STATE_FILE = os.path.join(_BASE_DIR, "data", "counter_state.json")
 USER_MAPPING_FILE = os.path.join(_BASE_DIR, "data", "overseerr_users.json")
 MEDIA_VOTES_FILE = os.path.join(_BASE_DIR, "data", "media_votes.json")
+MEDIA_VOTES_DB_FILE = os.path.join(_BASE_DIR, "data", "media_votes.db")
 MEDIA_VOTES_PROPOSED_FILE = os.path.join(_BASE_DIR, "data", "media_votes_proposed.json")
 AUTO_VOTE_LAST_RUN_FILE = os.path.join(_BASE_DIR, "data", "auto_vote_last_run.json")
+STATE_FLUSH_INTERVAL_SECONDS = int(os.getenv("STATE_FLUSH_INTERVAL_SECONDS", "10"))
+# Access request numbers reserved per counter write (1 = gap-free)
+REQUEST_COUNTER_BLOCK_SIZE = int(os.getenv("REQUEST_COUNTER_BLOCK_SIZE", "1"))
 
 # Admin commands (for permission checks)
 ADMIN_COMMANDS = [
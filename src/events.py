@@ -1,22 +1,23 @@
 """Event handlers for the Discord bot."""
 
-import os
 import re
 
 import discord
 from discord import app_commands
 
 from .bot import bot, tree
-from .config import DASHBOARD_STATE_FILE, NEWBIE_ROLE_ID, TEST_GUILD_ID
+from .config import NEWBIE_ROLE_ID, TEST_GUILD_ID
 from .extensions.dashboard import set_dashboard_state, update_dashboard
 from .extensions.overseerr import cache_overseerr_users, get_discord_id_for_overseerr_user
 from .extensions.onboarding import handle_access_request
+from .extensions.plex import refresh_media_stats
 from .extensions.media_votes import (
     auto_create_votes,
+    compact_vote_journal,
     handle_vote_interaction,
     resolve_expired_votes,
 )
-from .utils import load_dashboard_state
+from .utils import clear_dashboard_state, load_dashboard_state
 
 
 @bot.event
@@ -47,18 +48,23 @@ async def on_ready():
                 print("✅ Restored dashboard state")
             except discord.NotFound:
                 print("❌ Could not restore dashboard - message or channel not found")
-                if os.path.exists(DASHBOARD_STATE_FILE):
-                    os.remove(DASHBOARD_STATE_FILE)
+                clear_dashboard_state()
 
         # Start Overseerr user cache task
         if not cache_overseerr_users.is_running():
             cache_overseerr_users.start()
 
+        # Precompute /media_stats in the background
+        if not refresh_media_stats.is_running():
+            refresh_media_stats.start()
+
         # Start media vote tasks
         if not resolve_expired_votes.is_running():
             resolve_expired_votes.start()
         if not auto_create_votes.is_running():
             auto_create_votes.start()
+        if not compact_vote_journal.is_running():
+            compact_vote_journal.start()
     except Exception as e:
         print(f"❌ Sync failed: {e}")
 
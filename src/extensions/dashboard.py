@@ -1,14 +1,18 @@
 """Dashboard extension - system health dashboard with auto-refresh."""
 
-import os
 import time
 import discord
 from discord import app_commands
 from discord.ext import tasks
 
 from ..bot import bot, tree
-from ..config import DASHBOARD_STATE_FILE, TEST_GUILD_ID
-from ..utils import format_uptime, load_dashboard_state, save_dashboard_state
+from ..config import TEST_GUILD_ID
+from ..utils import (
+    clear_dashboard_state,
+    format_uptime,
+    load_dashboard_state,
+    save_dashboard_state,
+)
 
 # Global variables for dashboard state
 dashboard_message = None
@@ -113,8 +117,7 @@ async def dashboard(interaction: discord.Interaction):
                 except Exception:
                     pass
 
-                if os.path.exists(DASHBOARD_STATE_FILE):
-                    os.remove(DASHBOARD_STATE_FILE)
+                clear_dashboard_state()
         except Exception:
             pass
 
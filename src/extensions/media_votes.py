@@ -1,27 +1,31 @@
 """Media voting deletion extension - vote to delete unwatched media via Radarr/Sonarr."""
 
-import json
-import os
+import asyncio
+import itertools
 import re
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional
+from typing import Any, List, Optional, Set, Tuple
 
-import aiohttp
 import discord
 from discord import app_commands
 from discord.ext import tasks
-from plexapi.server import PlexServer
 
+from .. import http_client, vote_store
+from ..library_stats import show_size_gb
+from ..plex_client import get_plex_connection, iter_section, report_plex_error, run_plex
+from ..arr_catalog import radarr_catalog, size_on_disk_gb, sonarr_catalog
+from ..resilience import radarr_breaker, sonarr_breaker
+from ..single_flight import single_flight
 from ..bot import tree
+from ..state_store import state
+from ..vote_scoring import CandidateRanker, item_features
+from .plex import collect_media_stats
 from ..config import (
-    AUTO_VOTE_LAST_RUN_FILE,
+    AUTO_VOTE_REPROPOSE_MONTHS,
+    AUTO_VOTE_ROUND_SIZE,
     AUTO_VOTE_UNWATCHED_DAYS,
     MEDIA_VOTES_DRY_RUN,
-    MEDIA_VOTES_FILE,
-    MEDIA_VOTES_PROPOSED_FILE,
     VOTE_MENTION_ROLE_ID,
-    PLEX_TOKEN,
-    PLEX_URL,
     RADARR_API_KEY,
     RADARR_URL,
     SONARR_API_KEY,
@@ -29,6 +33,8 @@ from ..config import (
     TEST_GUILD_ID,
     VOTE_CHANNEL_ID,
     VOTE_DURATION_DAYS,
+    VOTE_ENRICH_CONCURRENCY,
+    VOTE_JOURNAL_RETENTION_DAYS,
 )
 
 
@@ -68,37 +74,23 @@ def _extract_tvdb_id(plex_item) -> Optional[int]:
 
 
 async def get_radarr_movie_by_tmdb(tmdb_id: int) -> Optional[dict]:
-    """Find Radarr movie by tmdbId. Returns movie dict or None."""
-    if not RADARR_URL or not RADARR_API_KEY:
-        return None
-    url = f"{RADARR_URL.rstrip('/')}/api/v3/movie"
-    headers = {"X-Api-Key": RADARR_API_KEY}
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, headers=headers) as resp:
-            if resp.status != 200:
-                return None
-            data = await resp.json()
-            for m in data:
-                if m.get("tmdbId") == tmdb_id:
-                    return m
-    return None
+    """Find Radarr movie by tmdbId (cached catalog). Returns movie dict or None."""
+    return await radarr_catalog.get(tmdb_id)
 
 
 async def get_sonarr_series_by_tvdb(tvdb_id: int) -> Optional[dict]:
-    """Find Sonarr series by tvdbId. Returns series dict or None."""
-    if not SONARR_URL or not SONARR_API_KEY:
-        return None
-    url = f"{SONARR_URL.rstrip('/')}/api/v3/series"
-    headers = {"X-Api-Key": SONARR_API_KEY}
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, headers=headers) as resp:
-            if resp.status != 200:
-                return None
-            data = await resp.json()
-            for s in data:
-                if s.get("tvdbId") == tvdb_id:
-                    return s
-    return None
+    """Find Sonarr series by tvdbId (cached catalog). Returns series dict or None."""
+    return await sonarr_catalog.get(tvdb_id)
+
+
+async def _arr_delete(url: str, api_key: str) -> bool:
+    """DELETE an *arr resource with its files. Server errors raise so the circuit breaker sees them."""
+    params = {"deleteFiles": "true"}
+    headers = {"X-Api-Key": api_key}
+    async with http_client.get_session().delete(url, params=params, headers=headers) as resp:
+        if resp.status >= 500:
+            resp.raise_for_status()
+        return resp.status in (200, 204)
 
 
 async def delete_radarr_movie(radarr_id: int) -> bool:
@@ -106,11 +98,10 @@ async def delete_radarr_movie(radarr_id: int) -> bool:
     if not RADARR_URL or not RADARR_API_KEY:
         return False
     url = f"{RADARR_URL.rstrip('/')}/api/v3/movie/{radarr_id}"
-    params = {"deleteFiles": "true"}
-    headers = {"X-Api-Key": RADARR_API_KEY}
-    async with aiohttp.ClientSession() as session:
-        async with session.delete(url, params=params, headers=headers) as resp:
-            return resp.status in (200, 204)
+    deleted = await radarr_breaker.call(_arr_delete, url, RADARR_API_KEY)
+    if deleted:
+        radarr_catalog.invalidate(radarr_id)
+    return deleted
 
 
 async def delete_sonarr_series(sonarr_id: int) -> bool:
@@ -118,79 +109,29 @@ async def delete_sonarr_series(sonarr_id: int) -> bool:
     if not SONARR_URL or not SONARR_API_KEY:
         return False
     url = f"{SONARR_URL.rstrip('/')}/api/v3/series/{sonarr_id}"
-    params = {"deleteFiles": "true"}
-    headers = {"X-Api-Key": SONARR_API_KEY}
-    async with aiohttp.ClientSession() as session:
-        async with session.delete(url, params=params, headers=headers) as resp:
-            return resp.status in (200, 204)
-
-
-# --- Vote persistence ---
-
-
-def _ensure_data_dir():
-    d = os.path.dirname(MEDIA_VOTES_FILE)
-    if d and not os.path.exists(d):
-        os.makedirs(d, exist_ok=True)
-
-
-def load_votes() -> dict:
-    """Load vote state from file."""
-    _ensure_data_dir()
-    if not os.path.exists(MEDIA_VOTES_FILE):
-        return {"votes": {}}
-    try:
-        with open(MEDIA_VOTES_FILE, "r") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
-        return {"votes": {}}
-
-
-def save_votes(data: dict):
-    """Save vote state to file."""
-    _ensure_data_dir()
-    with open(MEDIA_VOTES_FILE, "w") as f:
-        json.dump(data, f, indent=2)
-
-
-def load_proposed_rating_keys() -> set:
-    """Load set of Plex rating keys that have already been proposed for a vote (any round)."""
-    if not os.path.exists(MEDIA_VOTES_PROPOSED_FILE):
-        return set()
-    try:
-        with open(MEDIA_VOTES_PROPOSED_FILE, "r") as f:
-            data = json.load(f)
-        keys = data.get("proposed_rating_keys", [])
-        return set(str(k) for k in keys)
-    except (json.JSONDecodeError, IOError):
-        return set()
-
-
-def save_proposed_rating_keys(keys: set):
-    """Save set of proposed Plex rating keys."""
-    _ensure_data_dir()
-    with open(MEDIA_VOTES_PROPOSED_FILE, "w") as f:
-        json.dump({"proposed_rating_keys": list(keys)}, f, indent=2)
+    deleted = await sonarr_breaker.call(_arr_delete, url, SONARR_API_KEY)
+    if deleted:
+        sonarr_catalog.invalidate(sonarr_id)
+    return deleted
 
 
 # --- Plex helpers ---
 
 
-def get_plex_connection():
-    """Create a connection to Plex server."""
-    try:
-        return PlexServer(PLEX_URL, PLEX_TOKEN)
-    except Exception as e:
-        print(f"Error connecting to Plex: {e}")
-        return None
+@single_flight
+async def search_plex_media(query: str) -> List[dict]:
+    """Search all media libraries for query (off the event loop). Returns list of media info dicts.
+
+    Concurrent searches for the same query share one Plex lookup.
+    """
+    return await run_plex(_search_plex_media_sync, query)
 
 
-def search_plex_media(query: str) -> List[dict]:
-    """Search all media libraries for query. Returns list of media info dicts."""
+def _search_plex_media_sync(query: str) -> List[dict]:
     plex = get_plex_connection()
     if not plex:
         return []
-    results = []
+    matches = []
     library_names = ["Movies", "TV Shows", "Anime Shows", "Anime Movies"]
     seen_keys = set()
     for lib_name in library_names:
@@ -202,40 +143,73 @@ def search_plex_media(query: str) -> List[dict]:
                 if key in seen_keys:
                     continue
                 seen_keys.add(key)
-                info = _plex_item_to_info(item, lib_name)
-                if info:
-                    results.append(info)
+                matches.append((item, lib_name))
         except Exception as e:
+            report_plex_error(e)
             print(f"Error searching {lib_name}: {e}")
-    return results[:25]
+    return _plex_items_to_info(plex, matches[:25])
 
 
-def _plex_item_to_info(item, library: str) -> Optional[dict]:
-    """Convert Plex item to media info dict for vote creation."""
-    try:
-        item.reload()
-    except Exception:
-        pass
+def _item_size_gb(item, library: str) -> Optional[float]:
+    """Movie file size, or a show's episode total from the cached library statistics (None if not cached yet)."""
+    if "movie" in library.lower():
+        if hasattr(item, "media") and item.media and item.media[0].parts:
+            return (item.media[0].parts[0].size or 0) / (1024**3)
+        return 0.0
+    return show_size_gb(library, item.ratingKey)
+
+
+def _show_size_from_episodes(rating_key: str) -> float:
+    """Sum a show's episode sizes with one allLeaves request (blocking; fallback for shows
+    neither Sonarr nor the cached library statistics know about)."""
+    plex = get_plex_connection()
+    if not plex:
+        return 0.0
+    size_gb = 0.0
+    for ep in plex.fetchItems(f"/library/metadata/{rating_key}/allLeaves"):
+        if hasattr(ep, "media") and ep.media and ep.media[0].parts:
+            size_gb += (ep.media[0].parts[0].size or 0) / (1024**3)
+    return size_gb
+
+
+# Rating keys per /library/metadata/{k1,k2,...} request (keeps URLs short)
+_METADATA_BATCH_SIZE = 50
+
+
+def _plex_items_to_info(plex, entries: List[Tuple[Any, str]]) -> List[dict]:
+    """Convert (item, library) pairs to media info dicts.
+
+    Full metadata (guids) for all items is fetched in batched /library/metadata requests
+    instead of one reload() per item. Show sizes come from the cached library statistics;
+    size_gb is None for shows not in it yet (_build_vote_data asks Sonarr, then Plex).
+    """
+    full_items = {}
+    keys = [str(item.ratingKey) for item, _ in entries]
+    for start in range(0, len(keys), _METADATA_BATCH_SIZE):
+        batch = keys[start : start + _METADATA_BATCH_SIZE]
+        try:
+            for item in plex.fetchItems(f"/library/metadata/{','.join(batch)}"):
+                full_items[str(item.ratingKey)] = item
+        except Exception as e:
+            report_plex_error(e)
+            print(f"Error fetching Plex metadata: {e}")
+    results = []
+    for item, library in entries:
+        item = full_items.get(str(item.ratingKey), item)
+        info = _plex_item_to_info(item, library, _item_size_gb(item, library))
+        if info:
+            results.append(info)
+    return results
+
+
+def _plex_item_to_info(item, library: str, size_gb: Optional[float]) -> Optional[dict]:
+    """Convert a fully loaded Plex item to a media info dict for vote creation."""
     is_movie = "movie" in library.lower()
     title = getattr(item, "title", None) or "Unknown"
     year = getattr(item, "year", None)
     rating_key = str(item.ratingKey)
     added_at = getattr(item, "addedAt", None)
     last_viewed = getattr(item, "lastViewedAt", None)
-    size_gb = 0.0
-    try:
-        if is_movie:
-            if hasattr(item, "media") and item.media and item.media[0].parts:
-                size_gb = item.media[0].parts[0].size / (1024**3)
-        else:
-            for ep in item.episodes():
-                try:
-                    if hasattr(ep, "media") and ep.media and ep.media[0].parts:
-                        size_gb += ep.media[0].parts[0].size / (1024**3)
-                except Exception:
-                    pass
-    except Exception:
-        pass
     if is_movie:
         tmdb_id = _extract_tmdb_id(item)
         return {
@@ -244,7 +218,7 @@ def _plex_item_to_info(item, library: str) -> Optional[dict]:
             "tmdb_id": tmdb_id,
             "title": f"{title} ({year})" if year else title,
             "library": library,
-            "size_gb": round(size_gb, 2),
+            "size_gb": round(size_gb, 2) if size_gb is not None else None,
             "added_at": added_at.isoformat() if added_at else None,
             "last_viewed": last_viewed.isoformat() if last_viewed else None,
         }
@@ -256,7 +230,7 @@ def _plex_item_to_info(item, library: str) -> Optional[dict]:
             "tvdb_id": tvdb_id,
             "title": f"{title} ({year})" if year else title,
             "library": library,
-            "size_gb": round(size_gb, 2),
+            "size_gb": round(size_gb, 2) if size_gb is not None else None,
             "added_at": added_at.isoformat() if added_at else None,
             "last_viewed": last_viewed.isoformat() if last_viewed else None,
         }
@@ -386,34 +360,21 @@ class VoteView(discord.ui.View):
 
 
 async def _handle_vote(interaction: discord.Interaction, vote_key: str, vote_type: str):
-    """Handle Keep or Delete button press."""
-    data = load_votes()
-    votes = data.get("votes", {})
-    if vote_key not in votes:
-        await interaction.response.send_message("This vote has expired or been cancelled.", ephemeral=True)
-        return
-    vote = votes[vote_key]
-    user_id = str(interaction.user.id)
-    keep_voters = vote.get("keep_voters", [])
-    delete_voters = vote.get("delete_voters", [])
-
-    if vote_type == "keep":
-        if user_id in delete_voters:
-            delete_voters.remove(user_id)
-        if user_id not in keep_voters:
-            keep_voters.append(user_id)
-    else:
-        if user_id in keep_voters:
-            keep_voters.remove(user_id)
-        if user_id not in delete_voters:
-            delete_voters.append(user_id)
-
-    vote["keep_voters"] = keep_voters
-    vote["delete_voters"] = delete_voters
-    save_votes(data)
+    """Handle Keep or Delete button press.
 
-    embed = _build_vote_embed(vote)
-    await interaction.response.edit_message(embed=embed, view=VoteView(vote_key))
+    The interaction is deferred first so waiting for the lock cannot miss Discord's deadline.
+    The vote is updated and the message edited under the lock, so a resolution or
+    cancellation cannot be overwritten by a stale live embed. The change is written to
+    disk by vote_store.flush_vote_store.
+    """
+    await interaction.response.defer()
+    async with vote_store.lock_for(vote_key):
+        vote = vote_store.cast_vote(vote_key, str(interaction.user.id), vote_type)
+        if vote is not None:
+            await interaction.edit_original_response(embed=_build_vote_embed(vote), view=VoteView(vote_key))
+    if vote is None:
+        await interaction.followup.send("This vote has expired or been cancelled.", ephemeral=True)
+        return
     await interaction.followup.send("Vote recorded!", ephemeral=True)
 
 
@@ -493,10 +454,9 @@ async def _apply_vote_result(vote: dict, message: discord.Message) -> str:
 @tasks.loop(hours=1)
 async def resolve_expired_votes():
     """Check expired votes and delete or mark kept."""
-    data = load_votes()
+    data = vote_store.load_votes()
     votes = data.get("votes", {})
     now = datetime.utcnow()
-    to_remove = []
     for key, vote in list(votes.items()):
         ends_at_str = vote.get("ends_at")
         if not ends_at_str:
@@ -509,24 +469,41 @@ async def resolve_expired_votes():
             continue
         if ends_at > now:
             continue
-        channel_id = int(vote.get("channel_id", 0))
-        message_id = int(vote.get("message_id", 0))
-        if not channel_id or not message_id:
-            to_remove.append(key)
-            continue
-        try:
-            from ..bot import bot
-            channel = await bot.fetch_channel(channel_id)
-            message = await channel.fetch_message(message_id)
-        except discord.NotFound:
-            to_remove.append(key)
-            continue
-        await _apply_vote_result(vote, message)
-        to_remove.append(key)
-    for key in to_remove:
-        votes.pop(key, None)
-    if to_remove:
-        save_votes(data)
+        async with vote_store.lock_for(key):
+            vote = vote_store.get_vote(key)
+            if vote is None:
+                continue
+            channel_id = int(vote.get("channel_id", 0))
+            message_id = int(vote.get("message_id", 0))
+            if not channel_id or not message_id:
+                vote_store.delete_vote(key, detail="missing message")
+                continue
+            try:
+                from ..bot import bot
+                channel = await bot.fetch_channel(channel_id)
+                message = await channel.fetch_message(message_id)
+            except discord.NotFound:
+                vote_store.delete_vote(key, detail="message not found")
+                continue
+            try:
+                status = await _apply_vote_result(vote, message)
+            except Exception as e:
+                # Radarr/Sonarr down: leave the vote open and retry on the next run
+                print(f"Media votes: could not resolve {key}: {e}")
+                continue
+            vote_store.resolve_vote(key, status)
+
+
+@tasks.loop(hours=24)
+async def compact_vote_journal():
+    """Prune old journal records of finished votes and checkpoint the vote database."""
+    try:
+        removed = vote_store.compact_journal(VOTE_JOURNAL_RETENTION_DAYS)
+    except Exception as e:
+        print(f"Media votes: error compacting vote journal: {e}")
+        return
+    if removed:
+        print(f"Media votes: compacted {removed} journal record(s)")
 
 
 # --- Automated vote task ---
@@ -538,23 +515,13 @@ AUTO_VOTE_DEBOUNCE_MINUTES = 5
 
 
 def _read_auto_vote_state() -> dict:
-    """Read full state file (last_run, last_round_started)."""
-    if not os.path.exists(AUTO_VOTE_LAST_RUN_FILE):
-        return {}
-    try:
-        with open(AUTO_VOTE_LAST_RUN_FILE, "r") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
-        return {}
+    """Read full auto vote state (last_run, last_round_started)."""
+    return state.get_all("auto_vote")
 
 
 def _write_auto_vote_state(updates: dict):
-    """Merge updates into state file and write."""
-    _ensure_data_dir()
-    data = _read_auto_vote_state()
-    data.update(updates)
-    with open(AUTO_VOTE_LAST_RUN_FILE, "w") as f:
-        json.dump(data, f)
+    """Merge updates into the auto vote state."""
+    state.update("auto_vote", updates)
 
 
 def _get_auto_vote_last_run() -> Optional[datetime]:
@@ -582,8 +549,9 @@ def _get_last_round_started() -> Optional[datetime]:
 
 
 def _set_auto_vote_last_run():
-    """Save current time as last auto vote run."""
+    """Save current time as last auto vote run (written through immediately, so a restart keeps the cooldown)."""
     _write_auto_vote_state({"last_run": datetime.utcnow().isoformat()})
+    state.flush("auto_vote")
 
 
 def _set_last_round_started():
@@ -591,43 +559,38 @@ def _set_last_round_started():
     _write_auto_vote_state({"last_round_started": datetime.utcnow().isoformat()})
 
 
-async def _run_media_vote_round(bot: discord.Client) -> int:
-    """Run one round of media votes (find candidates, send intro, create up to 5 votes). Returns count created."""
-    if not VOTE_CHANNEL_ID:
-        print("Media votes: VOTE_CHANNEL_ID not set; skipping round")
-        return 0
-    try:
-        channel = await bot.fetch_channel(VOTE_CHANNEL_ID)
-    except discord.NotFound:
-        print(f"Media votes: vote channel not found for id={VOTE_CHANNEL_ID}; skipping round")
-        return 0
-    except discord.Forbidden:
-        print(f"Media votes: forbidden to fetch channel id={VOTE_CHANNEL_ID}; skipping round")
-        return 0
-    except Exception as e:
-        print(f"Media votes: failed to fetch channel id={VOTE_CHANNEL_ID}: {e}")
-        return 0
+def _find_vote_candidates(active_keys: Set[str], limit: int) -> Optional[List[dict]]:
+    """Find the `limit` best unwatched, not recently added items (blocking; run via run_plex).
+
+    Every matching item of every library is scored (see vote_scoring) and only the top
+    `limit` are kept, so metadata is fetched for those alone. Returns None if Plex is unavailable.
+    """
     plex = get_plex_connection()
     if not plex:
-        print("Media votes: Plex unavailable; skipping round")
-        return 0
-    data = load_votes()
-    votes = data.get("votes", {})
-    active_rating_keys = set()
-    for v in votes.values():
-        active_rating_keys.add(v.get("plex_rating_key", ""))
-    proposed_rating_keys = load_proposed_rating_keys()
-    excluded_keys = active_rating_keys | proposed_rating_keys
+        return None
     cutoff = datetime.utcnow() - timedelta(days=AUTO_VOTE_UNWATCHED_DAYS)
     added_cutoff = datetime.utcnow() - timedelta(days=30)
+    now = datetime.now()
     library_names = ["Movies", "TV Shows", "Anime Shows", "Anime Movies"]
-    candidates = []
+    ranker = CandidateRanker(limit)
+    repropose_days = AUTO_VOTE_REPROPOSE_MONTHS * 30
+    seen_keys = set(active_keys)
     for lib_name in library_names:
         try:
             lib = plex.library.section(lib_name)
-            items = lib.all()
-            for item in items:
-                if str(item.ratingKey) in excluded_keys:
+            # Let Plex do the filtering: never-watched items, then items last watched before
+            # the cutoff, both excluding recent additions. The checks below stay as a guard
+            # (for shows, "unwatched" also matches partly watched series).
+            matches = itertools.chain(
+                iter_section(lib, filters={"unwatched": True, "addedAt<<": added_cutoff}),
+                iter_section(lib, filters={"lastViewedAt<<": cutoff, "addedAt<<": added_cutoff}),
+            )
+            for item in matches:
+                rating_key = str(item.ratingKey)
+                if rating_key in seen_keys:
+                    continue
+                seen_keys.add(rating_key)
+                if vote_store.was_proposed(rating_key, within_days=repropose_days):
                     continue
                 last_viewed = getattr(item, "lastViewedAt", None)
                 if last_viewed and last_viewed.replace(tzinfo=None) > cutoff:
@@ -635,43 +598,85 @@ async def _run_media_vote_round(bot: discord.Client) -> int:
                 added_at = getattr(item, "addedAt", None)
                 if added_at and added_at.replace(tzinfo=None) > added_cutoff:
                     continue
-                info = _plex_item_to_info(item, lib_name)
-                if info:
-                    candidates.append(info)
-                if len(candidates) >= 5:
-                    break
-            if len(candidates) >= 5:
-                break
+                features = item_features(item, _item_size_gb(item, lib_name) or 0.0, now)
+                ranker.offer(features, (item, lib_name))
         except Exception as e:
+            report_plex_error(e)
             print(f"Error in auto vote for {lib_name}: {e}")
-    batch = candidates[:5]
+    return _plex_items_to_info(plex, ranker.top())
+
+
+async def _run_media_vote_round(bot: discord.Client) -> int:
+    """Run one round of media votes (find the best candidates, send intro, create up to AUTO_VOTE_ROUND_SIZE votes).
+
+    Returns count created.
+    """
+    if not VOTE_CHANNEL_ID:
+        print("Media votes: VOTE_CHANNEL_ID not set; skipping round")
+        return 0
+    try:
+        channel = await bot.fetch_channel(VOTE_CHANNEL_ID)
+    except discord.NotFound:
+        print(f"Media votes: vote channel not found for id={VOTE_CHANNEL_ID}; skipping round")
+        return 0
+    except discord.Forbidden:
+        print(f"Media votes: forbidden to fetch channel id={VOTE_CHANNEL_ID}; skipping round")
+        return 0
+    except Exception as e:
+        print(f"Media votes: failed to fetch channel id={VOTE_CHANNEL_ID}: {e}")
+        return 0
+    # Shows are ranked by the episode sizes from the library statistics; make sure they are current
+    await collect_media_stats()
+    active_keys = vote_store.active_rating_keys()
+    candidates = await run_plex(_find_vote_candidates, active_keys, AUTO_VOTE_ROUND_SIZE)
+    if candidates is None:
+        print("Media votes: Plex unavailable; skipping round")
+        return 0
+    batch = candidates[:AUTO_VOTE_ROUND_SIZE]
     if not batch:
         print("Media votes: no new candidates found for this round")
-    if batch:
-        intro = (
-            "**Media deletion vote** / **Vote de suppression de médias**\n\n"
-            "🇺🇸 Unwatched media is up for removal. Click **Keep** to save it, **Delete** to remove it. "
-            "When the vote ends, media with no Keep votes is deleted from the library.\n\n"
-            "🇫🇷 Des médias non regardés sont proposés à la suppression. Cliquez sur **Keep** pour les garder, "
-            "**Delete** pour les supprimer. À la fin du vote, les médias sans vote Keep sont supprimés de la bibliothèque."
-        )
-        if VOTE_MENTION_ROLE_ID and channel.guild:
-            role = channel.guild.get_role(VOTE_MENTION_ROLE_ID)
-            if role:
-                await channel.send(f"{role.mention}\n\n{intro}")
-            else:
-                await channel.send(intro)
+        return 0
+
+    # Stage 1: resolve *arr ids/metadata for every candidate concurrently (bounded)
+    semaphore = asyncio.Semaphore(VOTE_ENRICH_CONCURRENCY)
+
+    async def _bounded_build(info: dict) -> dict:
+        async with semaphore:
+            return await _build_vote_data(channel, info)
+
+    try:
+        vote_datas = await asyncio.gather(*(_bounded_build(info) for info in batch))
+    except Exception as e:
+        # Radarr/Sonarr unreachable: skip the round, the hourly task retries
+        print(f"Media votes: could not look up candidates in Radarr/Sonarr: {e}")
+        return 0
+
+    # Stage 2: post intro and votes sequentially (discord.py paces the sends against rate limits)
+    intro = (
+        "**Media deletion vote** / **Vote de suppression de médias**\n\n"
+        "🇺🇸 Unwatched media is up for removal. Click **Keep** to save it, **Delete** to remove it. "
+        "When the vote ends, media with no Keep votes is deleted from the library.\n\n"
+        "🇫🇷 Des médias non regardés sont proposés à la suppression. Cliquez sur **Keep** pour les garder, "
+        "**Delete** pour les supprimer. À la fin du vote, les médias sans vote Keep sont supprimés de la bibliothèque."
+    )
+    if VOTE_MENTION_ROLE_ID and channel.guild:
+        role = channel.guild.get_role(VOTE_MENTION_ROLE_ID)
+        if role:
+            await channel.send(f"{role.mention}\n\n{intro}")
         else:
             await channel.send(intro)
-    for info in batch:
-        await _create_and_post_vote(bot, channel, info, data, mention_role=False)
-        save_votes(data)
-    if batch:
-        proposed_rating_keys = load_proposed_rating_keys()
-        for info in batch:
-            proposed_rating_keys.add(info.get("plex_rating_key", ""))
-        save_proposed_rating_keys(proposed_rating_keys)
-    return len(batch)
+    else:
+        await channel.send(intro)
+    new_votes = {}
+    try:
+        for vote_data in vote_datas:
+            vote_key = await _post_vote(channel, vote_data, mention_role=False)
+            new_votes[vote_key] = vote_data
+    finally:
+        # Stage 3: persist everything that was posted (and mark it proposed) in a single write
+        if new_votes:
+            vote_store.save_new_votes(new_votes)
+    return len(new_votes)
 
 
 @tasks.loop(hours=1)
@@ -700,14 +705,8 @@ async def auto_create_votes():
         print(f"Media votes: auto round created {count} vote(s)")
 
 
-async def _create_and_post_vote(
-    bot: discord.Client,
-    channel: discord.TextChannel,
-    info: dict,
-    data: dict,
-    mention_role: bool = True,
-) -> bool:
-    """Create vote record and post embed. Returns True on success."""
+async def _build_vote_data(channel: discord.TextChannel, info: dict) -> dict:
+    """Resolve Radarr/Sonarr ids and metadata for a candidate and build its vote record (not yet posted)."""
     media_type = info.get("media_type", "")
     tmdb_id = info.get("tmdb_id")
     tvdb_id = info.get("tvdb_id")
@@ -715,6 +714,8 @@ async def _create_and_post_vote(
     sonarr_id = None
     title = info.get("title", "Unknown")
     added_at = info.get("added_at")
+    # Prefer what Radarr/Sonarr report on disk (all files, i.e. what deleting frees) over Plex parts
+    size_gb = info.get("size_gb")
     if media_type == "movie" and tmdb_id:
         movie = await get_radarr_movie_by_tmdb(tmdb_id)
         if movie:
@@ -724,6 +725,9 @@ async def _create_and_post_vote(
                 title = f"{movie['title']} ({year})" if year else movie["title"]
             if not added_at and movie.get("added"):
                 added_at = movie["added"][:10] if isinstance(movie["added"], str) else None
+            arr_size_gb = size_on_disk_gb(movie)
+            if arr_size_gb is not None:
+                size_gb = round(arr_size_gb, 2)
     elif media_type == "show" and tvdb_id:
         series = await get_sonarr_series_by_tvdb(tvdb_id)
         if series:
@@ -733,9 +737,18 @@ async def _create_and_post_vote(
                 title = f"{series['title']} ({year})" if year else series["title"]
             if not added_at and series.get("added"):
                 added_at = series["added"][:10] if isinstance(series["added"], str) else None
+            arr_size_gb = size_on_disk_gb(series)
+            if arr_size_gb is not None:
+                size_gb = round(arr_size_gb, 2)
+    if size_gb is None and info.get("plex_rating_key"):
+        try:
+            size_gb = round(await run_plex(_show_size_from_episodes, info["plex_rating_key"]), 2)
+        except Exception as e:
+            report_plex_error(e)
+            size_gb = 0
     now = datetime.utcnow()
     ends_at = (now + timedelta(days=VOTE_DURATION_DAYS)).isoformat()
-    vote_data = {
+    return {
         "message_id": "",
         "channel_id": str(channel.id),
         "media_type": media_type,
@@ -746,13 +759,17 @@ async def _create_and_post_vote(
         "sonarr_id": sonarr_id,
         "title": title,
         "library": info.get("library", ""),
-        "size_gb": info.get("size_gb", 0),
+        "size_gb": size_gb,
         "added_at": added_at[:10] if isinstance(added_at, str) else (added_at.isoformat()[:10] if added_at and hasattr(added_at, "isoformat") else None),
         "created_at": now.isoformat(),
         "ends_at": ends_at,
         "keep_voters": [],
         "delete_voters": [],
     }
+
+
+async def _post_vote(channel: discord.TextChannel, vote_data: dict, mention_role: bool = True) -> str:
+    """Post the vote embed and attach its buttons. Sets vote_data["message_id"] and returns the vote key."""
     embed = _build_vote_embed(vote_data)
     content = None
     if mention_role and VOTE_MENTION_ROLE_ID and channel.guild:
@@ -762,10 +779,15 @@ async def _create_and_post_vote(
     msg = await channel.send(content=content, embed=embed)
     vote_key = _vote_key(str(msg.id), str(channel.id))
     vote_data["message_id"] = str(msg.id)
+    # Accept clicks as soon as the buttons appear; the caller writes the vote with save_new_votes
+    vote_store.register_vote(vote_key, vote_data)
     view = _create_vote_view(vote_key)
-    await msg.edit(view=view)
-    data.setdefault("votes", {})[vote_key] = vote_data
-    return True
+    try:
+        await msg.edit(view=view)
+    except Exception:
+        vote_store.unregister_vote(vote_key)
+        raise
+    return vote_key
 
 
 # --- Commands ---
@@ -781,7 +803,7 @@ async def _create_and_post_vote(
 async def vote_delete(interaction: discord.Interaction, query: str):
     """Search Plex for media and create a vote embed."""
     await interaction.response.defer(ephemeral=True)
-    results = search_plex_media(query)
+    results = await search_plex_media(query)
     if not results:
         await interaction.followup.send(
             f"No media found for '{query}'. Try a different search term.",
@@ -794,22 +816,29 @@ async def vote_delete(interaction: discord.Interaction, query: str):
         if sel_interaction.user.id != interaction.user.id:
             await sel_interaction.response.send_message("This menu is not for you.", ephemeral=True)
             return
+        # Looking up sizes can be slow; answer within Discord's deadline and edit the menu afterwards
+        await sel_interaction.response.defer()
         idx = int(sel_interaction.values[0])
         info = results[idx]
+        existing = vote_store.find_vote_key_by_rating_key(info.get("plex_rating_key", ""))
+        if existing:
+            vote = vote_store.get_vote(existing)
+            await sel_interaction.edit_original_response(
+                content=f"**{info['title']}** already has an active vote (message ID {vote.get('message_id')}).",
+                view=None,
+            )
+            return
         channel = interaction.guild.get_channel(VOTE_CHANNEL_ID) if VOTE_CHANNEL_ID else None
         if not channel:
-            await sel_interaction.response.edit_message(
+            await sel_interaction.edit_original_response(
                 content="VOTE_CHANNEL_ID not set or channel not found. Set it in .env.",
                 view=None,
             )
             return
-        data = load_votes()
-        await _create_and_post_vote(interaction.client, channel, info, data)
-        save_votes(data)
-        proposed = load_proposed_rating_keys()
-        proposed.add(info.get("plex_rating_key", ""))
-        save_proposed_rating_keys(proposed)
-        await sel_interaction.response.edit_message(
+        vote_data = await _build_vote_data(channel, info)
+        vote_key = await _post_vote(channel, vote_data)
+        vote_store.save_new_votes({vote_key: vote_data})
+        await sel_interaction.edit_original_response(
             content=f"Vote created for **{info['title']}** in {channel.mention}",
             view=None,
         )
@@ -838,27 +867,28 @@ async def vote_delete(interaction: discord.Interaction, query: str):
 async def finish_vote(interaction: discord.Interaction, message_id: str):
     """Finish a vote immediately and apply the result (keep or delete)."""
     await interaction.response.defer(ephemeral=True)
-    data = load_votes()
-    votes = data.get("votes", {})
-    found = None
-    for key, vote in votes.items():
-        if vote.get("message_id") == message_id:
-            found = key
-            break
+    found = vote_store.find_vote_key_by_message(message_id)
     if not found:
         await interaction.followup.send("Vote not found or already resolved.", ephemeral=True)
         return
-    vote = votes[found]
-    channel_id = int(vote.get("channel_id", 0))
-    try:
-        channel = await interaction.client.fetch_channel(channel_id)
-        message = await channel.fetch_message(int(message_id))
-    except discord.NotFound:
-        await interaction.followup.send("Vote message not found.", ephemeral=True)
-        return
-    status = await _apply_vote_result(vote, message)
-    del votes[found]
-    save_votes(data)
+    async with vote_store.lock_for(found):
+        vote = vote_store.get_vote(found)
+        if not vote:
+            await interaction.followup.send("Vote not found or already resolved.", ephemeral=True)
+            return
+        channel_id = int(vote.get("channel_id", 0))
+        try:
+            channel = await interaction.client.fetch_channel(channel_id)
+            message = await channel.fetch_message(int(message_id))
+        except discord.NotFound:
+            await interaction.followup.send("Vote message not found.", ephemeral=True)
+            return
+        try:
+            status = await _apply_vote_result(vote, message)
+        except Exception as e:
+            await interaction.followup.send(f"Could not apply the result, vote left open: {e}", ephemeral=True)
+            return
+        vote_store.resolve_vote(found, status)
     await interaction.followup.send(f"Vote finished. Result: **{status}**.", ephemeral=True)
 
 
@@ -912,26 +942,24 @@ async def start_media_vote(
 async def cancel_vote(interaction: discord.Interaction, message_id: str):
     """Cancel an active vote."""
     await interaction.response.defer(ephemeral=True)
-    data = load_votes()
-    votes = data.get("votes", {})
-    found = None
-    for key, vote in votes.items():
-        if vote.get("message_id") == message_id:
-            found = key
-            break
+    found = vote_store.find_vote_key_by_message(message_id)
     if not found:
         await interaction.followup.send("Vote not found or already resolved.", ephemeral=True)
         return
-    channel_id = int(votes[found].get("channel_id", 0))
-    try:
-        channel = await interaction.client.fetch_channel(channel_id)
-        message = await channel.fetch_message(int(message_id))
-        embed = _build_vote_embed(votes[found], status="cancelled")
-        await message.edit(embed=embed, view=discord.ui.View())
-    except discord.NotFound:
-        pass
-    del votes[found]
-    save_votes(data)
+    async with vote_store.lock_for(found):
+        vote = vote_store.get_vote(found)
+        if not vote:
+            await interaction.followup.send("Vote not found or already resolved.", ephemeral=True)
+            return
+        channel_id = int(vote.get("channel_id", 0))
+        try:
+            channel = await interaction.client.fetch_channel(channel_id)
+            message = await channel.fetch_message(int(message_id))
+            embed = _build_vote_embed(vote, status="cancelled")
+            await message.edit(embed=embed, view=discord.ui.View())
+        except discord.NotFound:
+            pass
+        vote_store.delete_vote(found)
     await interaction.followup.send("Vote cancelled.", ephemeral=True)
 
 
@@ -944,33 +972,70 @@ async def cancel_vote(interaction: discord.Interaction, message_id: str):
 async def cancel_all_votes(interaction: discord.Interaction):
     """Cancel every active vote and clear state."""
     await interaction.response.defer(ephemeral=True)
-    data = load_votes()
+    data = vote_store.load_votes()
     votes = data.get("votes", {})
     if not votes:
         await interaction.followup.send("No active votes to cancel.", ephemeral=True)
         return
     cancelled = 0
-    for key, vote in list(votes.items()):
-        channel_id = int(vote.get("channel_id", 0))
-        message_id = vote.get("message_id")
-        if not channel_id or not message_id:
-            votes.pop(key, None)
+    for key in list(votes):
+        async with vote_store.lock_for(key):
+            vote = vote_store.get_vote(key)
+            if vote is None:
+                continue
+            channel_id = int(vote.get("channel_id", 0))
+            message_id = vote.get("message_id")
+            if channel_id and message_id:
+                try:
+                    channel = await interaction.client.fetch_channel(channel_id)
+                    message = await channel.fetch_message(int(message_id))
+                    embed = _build_vote_embed(vote, status="cancelled")
+                    await message.edit(embed=embed, view=discord.ui.View())
+                except discord.NotFound:
+                    pass
+            vote_store.delete_vote(key)
             cancelled += 1
-            continue
-        try:
-            channel = await interaction.client.fetch_channel(channel_id)
-            message = await channel.fetch_message(int(message_id))
-            embed = _build_vote_embed(vote, status="cancelled")
-            await message.edit(embed=embed, view=discord.ui.View())
-        except discord.NotFound:
-            pass
-        votes.pop(key, None)
-        cancelled += 1
-    data["votes"] = votes
-    save_votes(data)
     await interaction.followup.send(f"Cancelled **{cancelled}** vote(s).", ephemeral=True)
 
 
+VOTE_HISTORY_PAGE_SIZE = 10
+
+
+@tree.command(
+    name="vote_history",
+    description="Show past media deletion votes and their totals",
+    guild=discord.Object(id=TEST_GUILD_ID),
+)
+@app_commands.describe(page="Page number (10 votes per page, newest first)")
+async def vote_history(interaction: discord.Interaction, page: int = 1):
+    """Page through resolved votes with totals (space reclaimed, keep rate)."""
+    await interaction.response.defer(ephemeral=True)
+    stats = vote_store.get_vote_history_stats()
+    if not stats["total"]:
+        await interaction.followup.send("No votes have been resolved yet.", ephemeral=True)
+        return
+    pages = (stats["total"] + VOTE_HISTORY_PAGE_SIZE - 1) // VOTE_HISTORY_PAGE_SIZE
+    page = min(max(page, 1), pages)
+    entries = vote_store.get_vote_history(
+        limit=VOTE_HISTORY_PAGE_SIZE, offset=(page - 1) * VOTE_HISTORY_PAGE_SIZE
+    )
+    embed = discord.Embed(title="Media vote history", color=0x5865F2)
+    embed.add_field(name="Resolved", value=str(stats["total"]), inline=True)
+    embed.add_field(name="Kept", value=f"{stats['kept']} ({stats['keep_rate']:.0%})", inline=True)
+    embed.add_field(name="Deleted", value=str(stats["deleted"]), inline=True)
+    embed.add_field(name="Space reclaimed", value=f"{stats['reclaimed_gb']:.1f} GB", inline=False)
+    lines = []
+    for entry in entries:
+        lines.append(
+            f"• **{entry.get('title') or 'Unknown'}** — {entry['outcome']} "
+            f"({len(entry['keep_voters'])} keep / {len(entry['delete_voters'])} delete, "
+            f"{entry.get('size_gb') or 0} GB, {_format_date(entry.get('resolved_at'))})"
+        )
+    embed.add_field(name="Votes", value="\n".join(lines)[:1024], inline=False)
+    embed.set_footer(text=f"Page {page}/{pages}")
+    await interaction.followup.send(embed=embed, ephemeral=True)
+
+
 # --- Interaction routing (called from events.py) ---
 
 
@@ -6,7 +6,7 @@ from discord.ui import Button, View
 
 from ..bot import tree
 from ..config import TEST_GUILD_ID
-from ..utils import load_request_counter, save_request_counter
+from ..utils import allocate_request_number
 
 
 class OnboardingView(View):
@@ -507,8 +507,7 @@ async def handle_access_request(interaction: discord.Interaction):
         guild = interaction.guild
         user = interaction.user
 
-        request_counter = load_request_counter() + 1
-        save_request_counter(request_counter)
+        request_counter = await allocate_request_number()
 
         admin_role = discord.utils.get(guild.roles, name="🛡️ Admin")
         maintainer_role = discord.utils.get(guild.roles, name="🔧 Maintainer")
@@ -1,104 +1,196 @@
 """Overseerr extension - user linking, API, and media request notifications."""
 
-import json
-import os
-from typing import Any, Dict, List
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional
 
-import aiohttp
 import discord
 from discord import app_commands
 from discord.ext import tasks
 
+from .. import http_client
 from ..bot import tree
-from ..config import OVERSEERR_API_KEY, OVERSEERR_URL, TEST_GUILD_ID, USER_MAPPING_FILE
+from ..resilience import overseerr_breaker
+from ..single_flight import single_flight
+from ..config import (
+    OVERSEERR_API_KEY,
+    OVERSEERR_PAGE_CONCURRENCY,
+    OVERSEERR_PAGE_RETRIES,
+    OVERSEERR_PAGE_SIZE,
+    OVERSEERR_URL,
+    TEST_GUILD_ID,
+)
+from ..state_store import state
 
 # Global cache for Overseerr users
 overseerr_users_cache: List[Dict[str, Any]] = []
 
 
+# In-memory index of the "user_mappings" state (username -> discord_id and discord_id -> username).
+# Rebuilt when the file changes on disk (checked at most every 30s); writes update it directly.
+_MAPPING_RECHECK_SECONDS = 30
+_username_to_id: Dict[str, Any] = {}
+_id_to_username: Dict[str, str] = {}
+_mappings_loaded = False
+_mapping_checked_at = 0.0
+
+
+def _set_mappings(mappings: Dict[str, Any]):
+    _username_to_id.clear()
+    _username_to_id.update(mappings)
+    _id_to_username.clear()
+    for username, discord_id in mappings.items():
+        _id_to_username[str(discord_id)] = username
+
+
+def _refresh_mappings():
+    """Rebuild the mapping index on first use or if the file was edited outside the bot."""
+    global _mappings_loaded, _mapping_checked_at
+    now = time.monotonic()
+    if _mappings_loaded and now - _mapping_checked_at < _MAPPING_RECHECK_SECONDS:
+        return
+    _mapping_checked_at = now
+    if state.reload_if_changed("user_mappings") or not _mappings_loaded:
+        _set_mappings(state.get_all("user_mappings"))
+        _mappings_loaded = True
+
+
+def _write_mappings(mappings: Dict[str, Any]):
+    """Persist the username -> discord_id map and update the in-memory index."""
+    state.replace("user_mappings", mappings)
+    state.flush("user_mappings")
+    _set_mappings(mappings)
+
+
+def load_username_mappings() -> Dict[str, Any]:
+    """Return a copy of the Overseerr username -> Discord ID mappings."""
+    _refresh_mappings()
+    return dict(_username_to_id)
+
+
 def save_user_mapping(discord_id: int, overseerr_username: str) -> bool:
     """Save a Discord user to Overseerr username mapping."""
     try:
-        mappings = {}
-        if os.path.exists(USER_MAPPING_FILE):
-            with open(USER_MAPPING_FILE, "r") as f:
-                mappings = json.load(f)
-
+        mappings = load_username_mappings()
         mappings[overseerr_username.lower()] = discord_id
-
-        os.makedirs(os.path.dirname(USER_MAPPING_FILE), exist_ok=True)
-        with open(USER_MAPPING_FILE, "w") as f:
-            json.dump(mappings, f)
-
+        _write_mappings(mappings)
         return True
     except Exception as e:
         print(f"Error saving user mapping: {e}")
         return False
 
 
+def remove_user_mapping(overseerr_username: str) -> bool:
+    """Remove the mapping for an Overseerr username. Returns True if it existed."""
+    mappings = load_username_mappings()
+    if overseerr_username.lower() not in mappings:
+        return False
+    del mappings[overseerr_username.lower()]
+    _write_mappings(mappings)
+    return True
+
+
 def get_discord_id_for_overseerr_user(overseerr_username: str):
     """Get the Discord ID associated with an Overseerr username."""
-    try:
-        if os.path.exists(USER_MAPPING_FILE):
-            with open(USER_MAPPING_FILE, "r") as f:
-                mappings = json.load(f)
-                return mappings.get(overseerr_username.lower())
-    except Exception as e:
-        print(f"Error loading user mapping: {e}")
-    return None
+    _refresh_mappings()
+    return _username_to_id.get(overseerr_username.lower())
 
 
 def load_user_mappings() -> Dict[str, str]:
     """Load the Discord user to Overseerr username mappings (discord_id -> username)."""
-    try:
-        if os.path.exists(USER_MAPPING_FILE):
-            with open(USER_MAPPING_FILE, "r") as f:
-                mappings = json.load(f)
+    _refresh_mappings()
+    return dict(_id_to_username)
 
-            converted_mappings = {}
-            for username, discord_id in mappings.items():
-                converted_mappings[str(discord_id)] = username
 
-            return converted_mappings
-        return {}
-    except Exception as e:
-        print(f"Error loading user mappings: {e}")
-        return {}
+async def _fetch_user_page(headers: Dict[str, str], skip: int) -> Optional[Dict[str, Any]]:
+    """Fetch one page of Overseerr users, retrying with backoff. Returns the JSON body or None."""
+    session = http_client.get_session()
+    url = f"{OVERSEERR_URL}/api/v1/user?take={OVERSEERR_PAGE_SIZE}&skip={skip}"
+    for attempt in range(OVERSEERR_PAGE_RETRIES + 1):
+        try:
+            async with session.get(url, headers=headers) as response:
+                if response.status == 200:
+                    return await response.json()
+                print(f"Error fetching users (skip={skip}): {response.status}")
+        except Exception as e:
+            print(f"Error fetching Overseerr users (skip={skip}): {e}")
+        if attempt < OVERSEERR_PAGE_RETRIES:
+            await asyncio.sleep(0.5 * 2**attempt)
+    return None
+
+
+# Pages of the in-flight user fetch, and the callers that want them as they arrive
+_user_pages: List[List[Dict[str, Any]]] = []
+_user_page_listeners: List[Callable[[List[Dict[str, Any]]], None]] = []
+
+
+def _publish_user_page(users: List[Dict[str, Any]]):
+    _user_pages.append(users)
+    for listener in list(_user_page_listeners):
+        listener(users)
+
 
+@single_flight
+async def _fetch_overseerr_users() -> List[Dict[str, Any]]:
+    """Fetch all users, publishing each page to _user_page_listeners as it arrives.
 
-async def get_overseerr_users() -> List[Dict[str, Any]]:
-    """Fetch all users from Overseerr API."""
+    The first page gives the page count; the remaining pages are fetched concurrently
+    (at most OVERSEERR_PAGE_CONCURRENCY at a time).
+    """
     if not OVERSEERR_API_KEY:
         return []
 
+    if not overseerr_breaker.allow():
+        return []
+
     headers = {"X-Api-Key": OVERSEERR_API_KEY, "Content-Type": "application/json"}
 
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.get(
-                f"{OVERSEERR_URL}/api/v1/user?take=100&skip=0", headers=headers
-            ) as response:
-                if response.status != 200:
-                    print(f"Error fetching users: {response.status}")
-                    return []
-
-                data = await response.json()
-                total_pages = data.get("pageInfo", {}).get("pages", 1)
-                all_users = data.get("results", [])
-
-                for page in range(1, total_pages):
-                    async with session.get(
-                        f"{OVERSEERR_URL}/api/v1/user?take=100&skip={page*100}",
-                        headers=headers,
-                    ) as page_response:
-                        if page_response.status == 200:
-                            page_data = await page_response.json()
-                            all_users.extend(page_data.get("results", []))
-
-                return all_users
-        except Exception as e:
-            print(f"Error fetching Overseerr users: {e}")
+    _user_pages.clear()
+    try:
+        data = await _fetch_user_page(headers, 0)
+        if data is None:
+            overseerr_breaker.record_failure()
             return []
+        overseerr_breaker.record_success()
+        total_pages = data.get("pageInfo", {}).get("pages", 1)
+        all_users = data.get("results", [])
+        if all_users:
+            _publish_user_page(all_users)
+
+        semaphore = asyncio.Semaphore(OVERSEERR_PAGE_CONCURRENCY)
+
+        async def _fetch(page: int) -> List[Dict[str, Any]]:
+            async with semaphore:
+                page_data = await _fetch_user_page(headers, page * OVERSEERR_PAGE_SIZE)
+            results = page_data.get("results", []) if page_data else []
+            if results:
+                _publish_user_page(results)
+            return results
+
+        for results in await asyncio.gather(*(_fetch(page) for page in range(1, total_pages))):
+            all_users.extend(results)
+        return all_users
+    finally:
+        _user_pages.clear()
+
+
+async def get_overseerr_users(
+    on_page: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+) -> List[Dict[str, Any]]:
+    """Fetch all users from Overseerr API.
+
+    Concurrent calls share one fetch. on_page, if given, is called with each page's
+    users as soon as it arrives, including pages that arrived before this call joined.
+    """
+    if on_page is None:
+        return await _fetch_overseerr_users()
+    for users in _user_pages:
+        on_page(users)
+    _user_page_listeners.append(on_page)
+    try:
+        return await _fetch_overseerr_users()
+    finally:
+        _user_page_listeners.remove(on_page)
 
 
 async def overseerr_username_autocomplete(
@@ -146,8 +238,8 @@ async def overseerr_username_autocomplete(
 async def is_linked_to_overseerr(discord_id: int) -> bool:
     """Check if a Discord user has linked their Overseerr account."""
     try:
-        mappings = load_user_mappings()
-        return str(discord_id) in mappings
+        _refresh_mappings()
+        return str(discord_id) in _id_to_username
     except Exception as e:
         print(f"Error checking if user is linked: {e}")
         return False
@@ -156,8 +248,8 @@ async def is_linked_to_overseerr(discord_id: int) -> bool:
 def get_overseerr_username(discord_id: int) -> str:
     """Get the Overseerr username for a Discord user ID."""
     try:
-        mappings = load_user_mappings()
-        return mappings.get(str(discord_id))
+        _refresh_mappings()
+        return _id_to_username.get(str(discord_id))
     except Exception as e:
         print(f"Error retrieving Overseerr username: {e}")
         return None
@@ -166,11 +258,8 @@ def get_overseerr_username(discord_id: int) -> str:
 def get_discord_id_by_overseerr_username(overseerr_username: str) -> int:
     """Get the Discord user ID for an Overseerr username."""
     try:
-        mappings = load_user_mappings()
-        for discord_id, username in mappings.items():
-            if username.lower() == overseerr_username.lower():
-                return int(discord_id)
-        return None
+        discord_id = get_discord_id_for_overseerr_user(overseerr_username)
+        return int(discord_id) if discord_id is not None else None
     except Exception as e:
         print(f"Error retrieving Discord ID: {e}")
         return None
@@ -178,10 +267,15 @@ def get_discord_id_by_overseerr_username(overseerr_username: str) -> int:
 
 @tasks.loop(hours=1)
 async def cache_overseerr_users():
-    """Cache Overseerr users every hour."""
+    """Cache Overseerr users every hour.
+
+    On a cold cache, pages are streamed into it as they arrive so autocomplete can
+    serve partial results; a warm cache is swapped for the new list at the end.
+    """
     global overseerr_users_cache
     try:
-        overseerr_users = await get_overseerr_users()
+        on_page = overseerr_users_cache.extend if not overseerr_users_cache else None
+        overseerr_users = await get_overseerr_users(on_page=on_page)
         overseerr_users_cache = overseerr_users
         print(f"Cached {len(overseerr_users)} Overseerr users")
     except Exception as e:
@@ -255,10 +349,7 @@ async def list_overseerr_links(interaction: discord.Interaction):
     await interaction.response.defer(ephemeral=True)
 
     try:
-        mappings = {}
-        if os.path.exists(USER_MAPPING_FILE):
-            with open(USER_MAPPING_FILE, "r") as f:
-                mappings = json.load(f)
+        mappings = load_username_mappings()
 
         if not mappings:
             await interaction.followup.send(
@@ -341,16 +432,11 @@ async def unlink_overseerr(interaction: discord.Interaction, overseerr_username:
     await interaction.response.defer(ephemeral=True)
 
     try:
-        mappings = {}
-        if os.path.exists(USER_MAPPING_FILE):
-            with open(USER_MAPPING_FILE, "r") as f:
-                mappings = json.load(f)
+        linked_id = get_discord_id_for_overseerr_user(overseerr_username)
 
-        if overseerr_username.lower() in mappings:
-            if str(mappings[overseerr_username.lower()]) == str(interaction.user.id):
-                del mappings[overseerr_username.lower()]
-                with open(USER_MAPPING_FILE, "w") as f:
-                    json.dump(mappings, f)
+        if linked_id is not None:
+            if str(linked_id) == str(interaction.user.id):
+                remove_user_mapping(overseerr_username)
 
                 embed = discord.Embed(
                     title="✅ Account Unlinked | Compte Délié",
@@ -477,16 +563,11 @@ async def admin_unlink_overseerr(
     await interaction.response.defer(ephemeral=True)
 
     try:
-        mappings = {}
-        if os.path.exists(USER_MAPPING_FILE):
-            with open(USER_MAPPING_FILE, "r") as f:
-                mappings = json.load(f)
-
-        if overseerr_username.lower() in mappings:
-            if str(mappings[overseerr_username.lower()]) == str(discord_user.id):
-                del mappings[overseerr_username.lower()]
-                with open(USER_MAPPING_FILE, "w") as f:
-                    json.dump(mappings, f)
+        linked_id = get_discord_id_for_overseerr_user(overseerr_username)
+
+        if linked_id is not None:
+            if str(linked_id) == str(discord_user.id):
+                remove_user_mapping(overseerr_username)
 
                 embed = discord.Embed(
                     title="✅ Account Unlinked by Admin",
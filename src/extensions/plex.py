@@ -1,23 +1,55 @@
 """Plex extension - media statistics from Plex server."""
 
 import time
-from datetime import datetime, timedelta
+from typing import Optional
 
 import discord
 from discord import app_commands
-from plexapi.server import PlexServer
+from discord.ext import tasks
 
 from ..bot import tree
-from ..config import PLEX_TOKEN, PLEX_URL, TEST_GUILD_ID
+from ..config import MEDIA_STATS_REFRESH_MINUTES, TEST_GUILD_ID
+from ..library_stats import refresh_library_stats
+from ..plex_client import get_plex_connection, run_plex
+from ..single_flight import single_flight
 
 
-def get_plex_connection():
-    """Create a connection to Plex server."""
+def _collect_media_stats():
+    """Update the incremental library statistics (blocking; run via run_plex).
+
+    Returns None if Plex is unavailable.
+    """
+    plex_server = get_plex_connection()
+    if not plex_server:
+        return None
+    return refresh_library_stats(plex_server)
+
+
+# Last computed statistics (with "computed_at", epoch seconds); None until the first scan finishes
+_stats_snapshot: Optional[dict] = None
+
+
+@single_flight
+async def collect_media_stats() -> Optional[dict]:
+    """Aggregate library statistics off the event loop and store them as the current snapshot.
+
+    Concurrent callers share one scan. Returns None (keeping the old snapshot) if Plex is unavailable.
+    """
+    global _stats_snapshot
+    stats = await run_plex(_collect_media_stats)
+    if stats:
+        stats["computed_at"] = time.time()
+        _stats_snapshot = stats
+    return stats
+
+
+@tasks.loop(minutes=MEDIA_STATS_REFRESH_MINUTES)
+async def refresh_media_stats():
+    """Recompute the /media_stats snapshot in the background."""
     try:
-        return PlexServer(PLEX_URL, PLEX_TOKEN)
+        await collect_media_stats()
     except Exception as e:
-        print(f"Error connecting to Plex: {e}")
-        return None
+        print(f"Error refreshing media stats: {e}")
 
 
 @tree.command(
@@ -25,12 +57,15 @@ def get_plex_connection():
     description="Show statistics for Movies, TV Shows, Anime Shows, and Anime Movies",
     guild=discord.Object(id=TEST_GUILD_ID),
 )
-async def media_stats(interaction: discord.Interaction):
+@app_commands.describe(refresh="Rescan Plex now instead of showing the latest snapshot")
+async def media_stats(interaction: discord.Interaction, refresh: bool = False):
     """Display media library statistics from Plex."""
     await interaction.response.defer(ephemeral=True)
 
-    plex_server = get_plex_connection()
-    if not plex_server:
+    snapshot = _stats_snapshot
+    if refresh or not snapshot:
+        snapshot = await collect_media_stats() or snapshot
+    if not snapshot:
         await interaction.followup.send(
             "❌ Could not connect to Plex server. Please check your configuration.",
             ephemeral=True,
@@ -44,108 +79,17 @@ async def media_stats(interaction: discord.Interaction):
             color=0x1F2033,
         )
 
-        library_names = ["Movies", "TV Shows", "Anime Shows", "Anime Movies"]
-        library_stats = {}
-        recent_items = []
-
-        total_items = 0
-        total_size_gb = 0
-        total_duration_minutes = 0
-        total_episodes = 0
-        recent_date = datetime.now() - timedelta(days=7)
-
-        for library_name in library_names:
-            try:
-                library = plex_server.library.section(library_name)
-                library_items = library.all()
-                item_count = len(library_items)
-                total_items += item_count
-
-                library_size_gb = 0
-                duration_minutes = 0
-                recent_count = 0
-                episode_count = 0
-
-                if "movie" in library_name.lower():
-                    for movie in library_items:
-                        try:
-                            if hasattr(movie, "media") and movie.media:
-                                library_size_gb += movie.media[0].parts[0].size / (1024**3)
-                            if hasattr(movie, "duration"):
-                                duration_minutes += movie.duration / 60000
-                            if hasattr(movie, "addedAt") and movie.addedAt >= recent_date:
-                                recent_count += 1
-                                recent_items.append(
-                                    (movie.title, library_name, movie.year, movie.addedAt)
-                                )
-                        except Exception as e:
-                            print(f"Skipping movie {getattr(movie, 'title', 'unknown')}: {e}")
-
-                    days = int(duration_minutes // 1440)
-                    hours = int((duration_minutes % 1440) // 60)
-                    minutes = int(duration_minutes % 60)
-
-                    library_stats[library_name] = {
-                        "count": item_count,
-                        "size_gb": library_size_gb,
-                        "duration": f"{days}d {hours}h {minutes}m",
-                        "duration_minutes": duration_minutes,
-                        "recent_count": recent_count,
-                        "type": "movie",
-                    }
-
-                elif "show" in library_name.lower():
-                    for show in library_items:
-                        try:
-                            episodes = show.episodes()
-                            episode_count += len(episodes)
-                            for episode in episodes:
-                                try:
-                                    if hasattr(episode, "media") and episode.media:
-                                        library_size_gb += (
-                                            episode.media[0].parts[0].size / (1024**3)
-                                        )
-                                    if hasattr(episode, "duration"):
-                                        duration_minutes += episode.duration / 60000
-                                except Exception as e:
-                                    print(f"Skipping episode in {getattr(show, 'title', 'unknown')}: {e}")
-                            if hasattr(show, "addedAt") and show.addedAt >= recent_date:
-                                recent_count += 1
-                                recent_items.append(
-                                    (
-                                        show.title,
-                                        library_name,
-                                        len(episodes),
-                                        show.addedAt,
-                                    )
-                                )
-                        except Exception as e:
-                            print(f"Skipping show {getattr(show, 'title', 'unknown')}: {e}")
-
-                    days = int(duration_minutes // 1440)
-                    hours = int((duration_minutes % 1440) // 60)
-                    minutes = int(duration_minutes % 60)
-
-                    library_stats[library_name] = {
-                        "count": item_count,
-                        "episodes": episode_count,
-                        "size_gb": library_size_gb,
-                        "duration": f"{days}d {hours}h {minutes}m",
-                        "duration_minutes": duration_minutes,
-                        "recent_count": recent_count,
-                        "type": "show",
-                    }
-
-                total_size_gb += library_size_gb
-                total_duration_minutes += duration_minutes
-                total_episodes += episode_count
-
-            except Exception as e:
-                embed.add_field(
-                    name=f"❌ Error processing {library_name}",
-                    value=f"Error: {str(e)}",
-                    inline=False,
-                )
+        for library_name, error in snapshot["errors"]:
+            embed.add_field(
+                name=f"❌ Error processing {library_name}",
+                value=f"Error: {error}",
+                inline=False,
+            )
+
+        library_stats = snapshot["library_stats"]
+        recent_items = snapshot["recent_items"]
+        total_size_gb = snapshot["total_size_gb"]
+        total_duration_minutes = snapshot["total_duration_minutes"]
 
         total_days = int(total_duration_minutes // 1440)
         total_hours = int((total_duration_minutes % 1440) // 60)
@@ -216,7 +160,8 @@ async def media_stats(interaction: discord.Interaction):
         embed.add_field(name="", value="───────────────────────", inline=False)
 
         if recent_items:
-            recent_items.sort(key=lambda x: x[3], reverse=True)
+            # The snapshot is shared between callers; sort a copy
+            recent_items = sorted(recent_items, key=lambda x: x[3], reverse=True)
             recent_content = "```ansi\n\u001b[1;35mRECENT ADDITIONS\u001b[0m\n"
 
             for title, lib_type, year_or_eps, _ in recent_items[:6]:
@@ -232,9 +177,9 @@ async def media_stats(interaction: discord.Interaction):
             recent_content += "```"
             embed.add_field(name="", value=recent_content, inline=False)
 
-        current_time = time.strftime("%Y-%m-%d %H:%M:%S")
+        computed_time = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(snapshot["computed_at"]))
         embed.set_footer(
-            text=f"📊 Stats as of {current_time} • Use /media_stats to refresh"
+            text=f"📊 Stats as of {computed_time} • Use /media_stats refresh:True to rescan"
         )
 
         embed.set_thumbnail(
@@ -0,0 +1,44 @@
+"""Shared aiohttp session for all outbound HTTP (Overseerr, Radarr, Sonarr)."""
+
+from typing import Optional
+
+import aiohttp
+
+from .config import (
+    HTTP_CONNECT_TIMEOUT_SECONDS,
+    HTTP_DNS_CACHE_SECONDS,
+    HTTP_LIMIT_PER_HOST,
+    HTTP_TIMEOUT_SECONDS,
+)
+
+_session: Optional[aiohttp.ClientSession] = None
+
+
+def get_session() -> aiohttp.ClientSession:
+    """Return the shared session, creating it on first use (must run inside the event loop).
+
+    Connections are kept alive and pooled per host, and DNS lookups are cached, so
+    repeated API calls skip the TCP/TLS handshake.
+    """
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit_per_host=HTTP_LIMIT_PER_HOST,
+            ttl_dns_cache=HTTP_DNS_CACHE_SECONDS,
+            keepalive_timeout=60,
+        )
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(
+                total=HTTP_TIMEOUT_SECONDS, connect=HTTP_CONNECT_TIMEOUT_SECONDS
+            ),
+        )
+    return _session
+
+
+async def close():
+    """Close the shared session (called on bot shutdown)."""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
@@ -0,0 +1,201 @@
+"""Incremental Plex library statistics for /media_stats.
+
+Every movie, show and episode contributes a small entry keyed by its ratingKey. The
+first refresh lists each library in full; later refreshes only fetch items updated
+since the newest timestamp already seen, and detect deletions by comparing item
+counts (listing the keys only when the counts disagree).
+"""
+
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Set
+
+from plexapi import utils as plex_utils
+
+from .config import PLEX_PAGE_SIZE
+from .plex_client import iter_section, report_plex_error
+
+LIBRARY_NAMES = ["Movies", "TV Shows", "Anime Shows", "Anime Movies"]
+
+
+def _part_size_gb(item) -> float:
+    if hasattr(item, "media") and item.media and item.media[0].parts:
+        return (item.media[0].parts[0].size or 0) / (1024**3)
+    return 0.0
+
+
+def _duration_minutes(item) -> float:
+    return (getattr(item, "duration", None) or 0) / 60000
+
+
+def _movie_entry(movie) -> dict:
+    return {
+        "title": movie.title,
+        "year": movie.year,
+        "size_gb": _part_size_gb(movie),
+        "duration_minutes": _duration_minutes(movie),
+        "added_at": movie.addedAt,
+    }
+
+
+def _show_entry(show) -> dict:
+    return {"title": show.title, "added_at": show.addedAt}
+
+
+def _episode_entry(episode) -> dict:
+    return {
+        "show": episode.grandparentRatingKey,
+        "size_gb": _part_size_gb(episode),
+        "duration_minutes": _duration_minutes(episode),
+    }
+
+
+def _rating_keys(section, libtype: str) -> Set[int]:
+    """List only the ratingKeys of a section (raw XML pages, no plexapi objects built)."""
+    keys: Set[int] = set()
+    path = f"/library/sections/{section.key}/all?type={plex_utils.searchType(libtype)}&includeCollections=0"
+    start = 0
+    while True:
+        data = section._server.query(
+            f"{path}&X-Plex-Container-Start={start}&X-Plex-Container-Size={PLEX_PAGE_SIZE}"
+        )
+        page = [int(elem.attrib["ratingKey"]) for elem in data if elem.attrib.get("ratingKey")]
+        keys.update(page)
+        start += PLEX_PAGE_SIZE
+        total = data.attrib.get("totalSize")
+        if len(page) < PLEX_PAGE_SIZE or (total is not None and start >= int(total)):
+            return keys
+
+
+class _LibraryIndex:
+    """Contributions of one Plex library, kept between refreshes."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.is_movie = "movie" in name.lower()
+        # movie or show ratingKey -> entry; episode ratingKey -> entry (show libraries)
+        self.items: Dict[int, dict] = {}
+        self.episodes: Dict[int, dict] = {}
+        self.high_water: Optional[datetime] = None
+        # show ratingKey -> size of its episodes, rebuilt by stats(); None until first computed
+        self.show_sizes_gb: Optional[Dict[int, float]] = None
+
+    def _sync(
+        self, section, libtype: str, entries: Dict[int, dict], make_entry: Callable, since: Optional[datetime]
+    ) -> Optional[datetime]:
+        """Apply changes since `since` (everything if None) to entries. Returns the newest timestamp seen."""
+        # Entries are replaced by key, so re-reading items at the boundary second is harmless
+        filters = {"updatedAt>>": since - timedelta(seconds=1)} if since else None
+        newest = since
+        seen: Set[int] = set()
+        for item in iter_section(section, libtype, filters=filters):
+            entries[item.ratingKey] = make_entry(item)
+            seen.add(item.ratingKey)
+            for stamp in (getattr(item, "addedAt", None), getattr(item, "updatedAt", None)):
+                if stamp and (newest is None or stamp > newest):
+                    newest = stamp
+        if since is None:
+            for key in set(entries) - seen:
+                del entries[key]
+        elif section.totalViewSize(libtype=libtype, includeCollections=False) != len(entries):
+            current = _rating_keys(section, libtype)
+            for key in set(entries) - current:
+                del entries[key]
+            if current - set(entries):
+                # Something was missed by the delta query; rebuild this type from scratch
+                return self._sync(section, libtype, entries, make_entry, None)
+        return newest
+
+    def refresh(self, plex_server):
+        section = plex_server.library.section(self.name)
+        since = self.high_water
+        if self.is_movie:
+            newest = self._sync(section, "movie", self.items, _movie_entry, since)
+        else:
+            newest = self._sync(section, "show", self.items, _show_entry, since)
+            episodes_newest = self._sync(section, "episode", self.episodes, _episode_entry, since)
+            if episodes_newest and (newest is None or episodes_newest > newest):
+                newest = episodes_newest
+        self.high_water = newest
+
+    def stats(self, recent_date: datetime, recent_items: list) -> dict:
+        """Library totals in the /media_stats format; appends this library's recent additions."""
+        if self.is_movie:
+            contributions = self.items.values()
+        else:
+            contributions = self.episodes.values()
+        size_gb = sum(entry["size_gb"] for entry in contributions)
+        duration_minutes = sum(entry["duration_minutes"] for entry in contributions)
+
+        if not self.is_movie:
+            episodes_per_show: Dict[int, int] = {}
+            show_sizes_gb: Dict[int, float] = {}
+            for entry in self.episodes.values():
+                episodes_per_show[entry["show"]] = episodes_per_show.get(entry["show"], 0) + 1
+                show_sizes_gb[entry["show"]] = show_sizes_gb.get(entry["show"], 0.0) + entry["size_gb"]
+            self.show_sizes_gb = show_sizes_gb
+
+        recent_count = 0
+        for key, entry in self.items.items():
+            if entry["added_at"] and entry["added_at"] >= recent_date:
+                recent_count += 1
+                year_or_eps = entry["year"] if self.is_movie else episodes_per_show.get(key, 0)
+                recent_items.append((entry["title"], self.name, year_or_eps, entry["added_at"]))
+
+        days = int(duration_minutes // 1440)
+        hours = int((duration_minutes % 1440) // 60)
+        minutes = int(duration_minutes % 60)
+        stats = {
+            "count": len(self.items),
+            "size_gb": size_gb,
+            "duration": f"{days}d {hours}h {minutes}m",
+            "duration_minutes": duration_minutes,
+            "recent_count": recent_count,
+            "type": "movie" if self.is_movie else "show",
+        }
+        if not self.is_movie:
+            stats["episodes"] = len(self.episodes)
+        return stats
+
+
+_libraries: Dict[str, _LibraryIndex] = {name: _LibraryIndex(name) for name in LIBRARY_NAMES}
+
+
+def show_size_gb(library_name: str, rating_key: int) -> Optional[float]:
+    """Size of a show's episodes from the last statistics refresh (None if not known yet)."""
+    library = _libraries.get(library_name)
+    if library is None or library.show_sizes_gb is None:
+        return None
+    return library.show_sizes_gb.get(int(rating_key))
+
+
+def refresh_library_stats(plex_server) -> dict:
+    """Bring every library index up to date and return the aggregated statistics (blocking).
+
+    Not safe to run concurrently; callers go through the single-flight collect_media_stats().
+    """
+    library_stats = {}
+    recent_items = []
+    errors = []
+    total_size_gb = 0
+    total_duration_minutes = 0
+    recent_date = datetime.now() - timedelta(days=7)
+
+    for name, library in _libraries.items():
+        try:
+            library.refresh(plex_server)
+        except Exception as e:
+            report_plex_error(e)
+            errors.append((name, str(e)))
+            continue
+        stats = library.stats(recent_date, recent_items)
+        library_stats[name] = stats
+        total_size_gb += stats["size_gb"]
+        total_duration_minutes += stats["duration_minutes"]
+
+    return {
+        "library_stats": library_stats,
+        "recent_items": recent_items,
+        "errors": errors,
+        "total_size_gb": total_size_gb,
+        "total_duration_minutes": total_duration_minutes,
+    }
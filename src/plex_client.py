@@ -0,0 +1,103 @@
+"""Async facade over the synchronous plexapi library, sharing one Plex connection."""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterator, Optional, TypeVar
+
+import requests
+from plexapi.server import PlexServer
+from requests.adapters import HTTPAdapter
+
+from .config import PLEX_EXECUTOR_WORKERS, PLEX_PAGE_SIZE, PLEX_TOKEN, PLEX_URL
+from .resilience import CircuitOpenError, plex_breaker
+
+T = TypeVar("T")
+
+# plexapi blocks on HTTP; its calls run here so the gateway heartbeat and other
+# commands keep going during long library scans. The pool bounds concurrent Plex work.
+_executor = ThreadPoolExecutor(max_workers=PLEX_EXECUTOR_WORKERS, thread_name_prefix="plex")
+
+_server: Optional[PlexServer] = None
+_server_lock = threading.Lock()
+
+
+def _new_session() -> requests.Session:
+    """requests session with a keep-alive pool large enough for every executor thread."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=PLEX_EXECUTOR_WORKERS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_plex_connection() -> Optional[PlexServer]:
+    """Return the shared Plex server, connecting on first use (None while Plex is down).
+
+    Blocking: call from the Plex thread pool (run_plex).
+    """
+    global _server
+    if _server is not None:
+        return _server
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = plex_breaker.call_sync(PlexServer, PLEX_URL, PLEX_TOKEN, session=_new_session())
+            except CircuitOpenError:
+                return None
+            except Exception as e:
+                print(f"Error connecting to Plex: {e}")
+                return None
+        return _server
+
+
+def reset_plex_connection():
+    """Drop the shared connection so the next get_plex_connection() reconnects."""
+    global _server
+    with _server_lock:
+        if _server is not None:
+            _server._session.close()
+        _server = None
+
+
+def report_plex_error(error: Exception):
+    """Note a failed Plex request: connection-level errors reset the shared connection
+    and count against the Plex circuit breaker."""
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        plex_breaker.record_failure()
+        reset_plex_connection()
+
+
+def iter_section(section, libtype: Optional[str] = None, page_size: int = PLEX_PAGE_SIZE, **search_args) -> Iterator:
+    """Yield the items of a library section one page (container_start/container_size) at a time.
+
+    Unlike section.all(), only one page is held in memory, and a consumer that stops
+    early never fetches the remaining pages. search_args (filters, sort, ...) are passed
+    to section.search(). Blocking: use from the Plex thread pool.
+    """
+    start = 0
+    while True:
+        page = section.search(
+            libtype=libtype,
+            container_start=start,
+            container_size=page_size,
+            maxresults=page_size,
+            **search_args,
+        )
+        yield from page
+        if len(page) < page_size:
+            return
+        start += page_size
+
+
+async def run_plex(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking plexapi call (or a function built from them) in the Plex thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+
+def shutdown():
+    """Stop the Plex thread pool and close the shared connection (called on bot shutdown)."""
+    _executor.shutdown(wait=False, cancel_futures=True)
+    reset_plex_connection()
@@ -0,0 +1,118 @@
+"""Circuit breakers for the external backends (Plex, Overseerr, Radarr, Sonarr)."""
+
+import threading
+import time
+from typing import Any, Awaitable, Callable, TypeVar
+
+from .config import (
+    CIRCUIT_BASE_BACKOFF_SECONDS,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_MAX_BACKOFF_SECONDS,
+)
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a backend that is known to be down."""
+
+
+class CircuitBreaker:
+    """Fail fast while a backend is down.
+
+    After failure_threshold consecutive failures the circuit opens and calls are
+    rejected immediately. Once the backoff has elapsed a single half-open probe is let
+    through: success closes the circuit, failure re-opens it with double the backoff
+    (capped at max_backoff). Thread-safe, since the Plex breaker is shared by the Plex thread pool.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        base_backoff: float = CIRCUIT_BASE_BACKOFF_SECONDS,
+        max_backoff: float = CIRCUIT_MAX_BACKOFF_SECONDS,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.state = self.CLOSED
+        self._failures = 0
+        self._trips = 0
+        self._open_until = 0.0
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Return True if a call may go to the backend now (callers must then record the outcome)."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            now = time.monotonic()
+            if self.state == self.OPEN and now >= self._open_until:
+                self.state = self.HALF_OPEN
+                self._probe_started = now
+                return True
+            # A probe that never reported back (e.g. cancelled) must not wedge the circuit half-open
+            if self.state == self.HALF_OPEN and now - self._probe_started >= self.base_backoff:
+                self._probe_started = now
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                print(f"{self.name} is back up; circuit closed")
+            self.state = self.CLOSED
+            self._failures = 0
+            self._trips = 0
+
+    def record_failure(self):
+        with self._lock:
+            # Already failing fast: further failures from the same outage must not extend the backoff
+            if self.state == self.OPEN:
+                return
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                backoff = min(self.base_backoff * 2**self._trips, self.max_backoff)
+                self._trips += 1
+                self._open_until = time.monotonic() + backoff
+                self.state = self.OPEN
+                print(f"{self.name} unavailable; failing fast for {backoff:.0f}s")
+
+    def _check(self):
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} is unavailable (circuit open)")
+
+    async def call(self, func: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        """Await func through the breaker. Raises CircuitOpenError while the circuit is open."""
+        self._check()
+        try:
+            result = await func(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+    def call_sync(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Synchronous counterpart of call()."""
+        self._check()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+
+plex_breaker = CircuitBreaker("Plex")
+overseerr_breaker = CircuitBreaker("Overseerr")
+radarr_breaker = CircuitBreaker("Radarr")
+sonarr_breaker = CircuitBreaker("Sonarr")
@@ -0,0 +1,137 @@
+"""Small JSON state files behind one cached, atomically-written store."""
+
+import copy
+import json
+import os
+import tempfile
+from typing import Any, Dict, Optional
+
+from discord.ext import tasks
+
+from .config import (
+    AUTO_VOTE_LAST_RUN_FILE,
+    COUNTER_STATE_FILE,
+    DASHBOARD_STATE_FILE,
+    STATE_FLUSH_INTERVAL_SECONDS,
+    USER_MAPPING_FILE,
+)
+
+
+class StateStore:
+    """Namespaced key/value state, one JSON file per namespace.
+
+    Each namespace is read from disk once and then served from memory. Writes only
+    mark the namespace dirty; flush() writes dirty namespaces with a temp file plus
+    os.replace so a crash never leaves a half-written file behind.
+    """
+
+    def __init__(self, paths: Dict[str, str]):
+        self._paths = paths
+        self._data: Dict[str, dict] = {}
+        self._mtimes: Dict[str, Optional[float]] = {}
+        self._dirty: set = set()
+
+    def _mtime(self, namespace: str) -> Optional[float]:
+        try:
+            return os.path.getmtime(self._paths[namespace])
+        except OSError:
+            return None
+
+    def _load(self, namespace: str) -> dict:
+        if namespace not in self._data:
+            path = self._paths[namespace]
+            data = {}
+            if os.path.exists(path):
+                try:
+                    with open(path, "r") as f:
+                        data = json.load(f)
+                except (json.JSONDecodeError, IOError) as e:
+                    print(f"Error loading state '{namespace}': {e}")
+            self._data[namespace] = data if isinstance(data, dict) else {}
+            self._mtimes[namespace] = self._mtime(namespace)
+        return self._data[namespace]
+
+    def reload_if_changed(self, namespace: str) -> bool:
+        """Drop the cached copy if the file was changed outside the bot. Returns True if reloaded."""
+        if namespace not in self._data or namespace in self._dirty:
+            return False
+        if self._mtime(namespace) == self._mtimes.get(namespace):
+            return False
+        del self._data[namespace]
+        self._load(namespace)
+        return True
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        return copy.deepcopy(self._load(namespace).get(key, default))
+
+    def get_all(self, namespace: str) -> dict:
+        return copy.deepcopy(self._load(namespace))
+
+    def set(self, namespace: str, key: str, value: Any):
+        self._load(namespace)[key] = value
+        self._dirty.add(namespace)
+
+    def update(self, namespace: str, values: dict):
+        self._load(namespace).update(values)
+        self._dirty.add(namespace)
+
+    def replace(self, namespace: str, data: dict):
+        self._data[namespace] = dict(data)
+        self._dirty.add(namespace)
+
+    def delete(self, namespace: str, key: str):
+        if self._load(namespace).pop(key, None) is not None:
+            self._dirty.add(namespace)
+
+    def clear(self, namespace: str):
+        """Forget a namespace entirely and remove its file."""
+        self._data[namespace] = {}
+        self._dirty.discard(namespace)
+        path = self._paths[namespace]
+        if os.path.exists(path):
+            os.remove(path)
+        self._mtimes[namespace] = None
+
+    def _write(self, namespace: str):
+        path = self._paths[namespace]
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(self._data[namespace], f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._mtimes[namespace] = self._mtime(namespace)
+
+    def flush(self, namespace: Optional[str] = None):
+        """Write one dirty namespace (or all of them) to disk."""
+        namespaces = [namespace] if namespace else list(self._dirty)
+        for ns in namespaces:
+            if ns in self._dirty:
+                self._write(ns)
+                self._dirty.discard(ns)
+
+
+state = StateStore(
+    {
+        "dashboard": DASHBOARD_STATE_FILE,
+        "counter": COUNTER_STATE_FILE,
+        "auto_vote": AUTO_VOTE_LAST_RUN_FILE,
+        "user_mappings": USER_MAPPING_FILE,
+    }
+)
+
+
+@tasks.loop(seconds=STATE_FLUSH_INTERVAL_SECONDS)
+async def flush_state_store():
+    """Write batched state changes to disk."""
+    try:
+        state.flush()
+    except Exception as e:
+        print(f"Error flushing state: {e}")
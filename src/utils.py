@@ -1,10 +1,11 @@
 """Utility functions for the homelab Discord bot."""
 
-import json
+import asyncio
 import logging
-import os
+from typing import Optional
 
-from .config import COUNTER_STATE_FILE, DASHBOARD_STATE_FILE
+from .config import REQUEST_COUNTER_BLOCK_SIZE
+from .state_store import state
 
 logger = logging.getLogger("discord_bot")
 
@@ -28,45 +29,68 @@ def format_uptime(uptime_seconds):
 
 
 def save_dashboard_state(channel_id, message_id):
-    """Save the dashboard state to a file."""
+    """Save the dashboard state."""
     try:
-        state = {"channel_id": channel_id, "message_id": message_id}
-        os.makedirs(os.path.dirname(DASHBOARD_STATE_FILE), exist_ok=True)
-        with open(DASHBOARD_STATE_FILE, "w") as f:
-            json.dump(state, f)
+        state.replace("dashboard", {"channel_id": channel_id, "message_id": message_id})
     except Exception as e:
         print(f"Error saving dashboard state: {e}")
 
 
 def load_dashboard_state():
-    """Load the dashboard state from file."""
+    """Load the dashboard state (None if no dashboard was started)."""
     try:
-        if os.path.exists(DASHBOARD_STATE_FILE):
-            with open(DASHBOARD_STATE_FILE, "r") as f:
-                return json.load(f)
+        data = state.get_all("dashboard")
+        if data:
+            return data
     except Exception as e:
         print(f"Error loading dashboard state: {e}")
     return None
 
 
+def clear_dashboard_state():
+    """Forget the dashboard state and remove its file."""
+    try:
+        state.clear("dashboard")
+    except Exception as e:
+        print(f"Error clearing dashboard state: {e}")
+
+
 def load_request_counter():
-    """Load the request counter from file."""
+    """Load the request counter."""
     try:
-        if os.path.exists(COUNTER_STATE_FILE):
-            with open(COUNTER_STATE_FILE, "r") as f:
-                state = json.load(f)
-                return state.get("counter", 0)
+        return state.get("counter", "counter", 0)
     except Exception as e:
         print(f"Error loading request counter: {e}")
     return 0
 
 
 def save_request_counter(counter):
-    """Save the request counter to a file."""
-    try:
-        state = {"counter": counter}
-        os.makedirs(os.path.dirname(COUNTER_STATE_FILE), exist_ok=True)
-        with open(COUNTER_STATE_FILE, "w") as f:
-            json.dump(state, f)
-    except Exception as e:
-        print(f"Error saving request counter: {e}")
+    """Save the request counter (written through immediately; write errors propagate)."""
+    state.set("counter", "counter", counter)
+    state.flush("counter")
+
+
+# Request numbers are handed out from a block reserved in the counter state, so a burst
+# of access requests needs one write per block instead of one per request.
+_counter_lock = asyncio.Lock()
+_next_request_number: Optional[int] = None
+_reserved_until = 0
+
+
+async def allocate_request_number() -> int:
+    """Return the next unique access request number.
+
+    With REQUEST_COUNTER_BLOCK_SIZE > 1, numbers left in a block when the bot stops are skipped.
+    """
+    global _next_request_number, _reserved_until
+    async with _counter_lock:
+        if _next_request_number is None:
+            _next_request_number = load_request_counter() + 1
+        if _next_request_number > _reserved_until:
+            # Only hand out numbers from a block that is on disk, or a restart would reuse them
+            reserved_until = _next_request_number + max(REQUEST_COUNTER_BLOCK_SIZE, 1) - 1
+            save_request_counter(reserved_until)
+            _reserved_until = reserved_until
+        number = _next_request_number
+        _next_request_number += 1
+        return number
@@ -0,0 +1,72 @@
+"""Rank auto-vote candidates so each round targets the biggest wins."""
+
+import heapq
+import itertools
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from .config import AUTO_VOTE_SCORE_WEIGHTS
+
+FEATURES = ("size_gb", "days_since_viewed", "days_since_added", "view_count")
+
+
+def parse_weights(spec: str) -> Dict[str, float]:
+    """Parse "feature=weight,..." (unknown features and bad numbers are reported and ignored)."""
+    weights = {}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        name, _, value = part.partition("=")
+        name = name.strip()
+        try:
+            if name not in FEATURES:
+                raise ValueError(f"unknown feature '{name}'")
+            weights[name] = float(value)
+        except ValueError as e:
+            print(f"Ignoring auto vote score weight '{part.strip()}': {e}")
+    return weights
+
+
+def item_features(item, size_gb: float, now: Optional[datetime] = None) -> Dict[str, float]:
+    """Scoring features of a Plex movie or show (dates are Plex's naive local datetimes)."""
+    now = now or datetime.now()
+    added_at = getattr(item, "addedAt", None)
+    last_viewed = getattr(item, "lastViewedAt", None)
+    days_since_added = (now - added_at).days if added_at else 0
+    return {
+        "size_gb": size_gb,
+        "days_since_viewed": (now - last_viewed).days if last_viewed else days_since_added,
+        "days_since_added": days_since_added,
+        "view_count": getattr(item, "viewCount", None) or 0,
+    }
+
+
+class CandidateRanker:
+    """Keep the `limit` highest-scoring candidates seen so far.
+
+    A min-heap of at most `limit` entries: each offer is O(log limit) and memory stays
+    constant however many items are streamed through.
+    """
+
+    def __init__(self, limit: int, weights: Optional[Dict[str, float]] = None):
+        self.limit = limit
+        self.weights = parse_weights(AUTO_VOTE_SCORE_WEIGHTS) if weights is None else weights
+        self._heap: List[tuple] = []
+        self._order = itertools.count()  # tie-breaker: earlier items win equal scores
+
+    def score(self, features: Dict[str, float]) -> float:
+        return sum(weight * features.get(name, 0) for name, weight in self.weights.items())
+
+    def offer(self, features: Dict[str, float], payload: Any) -> float:
+        """Consider a candidate; returns its score."""
+        score = self.score(features)
+        entry = (score, -next(self._order), payload)
+        if len(self._heap) < self.limit:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+        return score
+
+    def top(self) -> List[Any]:
+        """Payloads of the best candidates, highest score first."""
+        return [payload for _, _, payload in sorted(self._heap, key=lambda e: e[:2], reverse=True)]
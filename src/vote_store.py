@@ -0,0 +1,612 @@
+"""SQLite-backed storage for media deletion votes."""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+from discord.ext import tasks
+
+from .config import (
+    MEDIA_VOTES_DB_FILE,
+    MEDIA_VOTES_FILE,
+    MEDIA_VOTES_PROPOSED_FILE,
+    VOTE_FLUSH_INTERVAL_SECONDS,
+)
+
+_conn: Optional[sqlite3.Connection] = None
+_conn_thread: Optional[int] = None
+# Read-only connections for worker threads (the Plex pool checks eligibility mid-scan)
+_thread_local = threading.local()
+
+# In-memory source of truth for active votes; voter changes are flushed to disk in batches.
+_votes: Optional[Dict[str, dict]] = None
+_dirty: Set[str] = set()
+_pending_events: List[tuple] = []
+_locks: Dict[str, asyncio.Lock] = {}
+# Votes already posted (clickable) but not yet written by save_new_votes; flush() holds them back.
+_unsaved: Set[str] = set()
+
+# Secondary indexes over _votes, maintained on every create/delete.
+_by_message: Dict[str, str] = {}
+_by_rating_key: Dict[str, str] = {}
+
+# Vote columns persisted in the votes table (everything except the voter lists).
+_VOTE_COLUMNS = [
+    "message_id",
+    "channel_id",
+    "media_type",
+    "plex_rating_key",
+    "tmdb_id",
+    "tvdb_id",
+    "radarr_id",
+    "sonarr_id",
+    "title",
+    "library",
+    "size_gb",
+    "added_at",
+    "last_viewed",
+    "created_at",
+    "ends_at",
+]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS votes (
+    vote_key TEXT PRIMARY KEY,
+    message_id TEXT NOT NULL DEFAULT '',
+    channel_id TEXT NOT NULL DEFAULT '',
+    media_type TEXT,
+    plex_rating_key TEXT,
+    tmdb_id INTEGER,
+    tvdb_id INTEGER,
+    radarr_id INTEGER,
+    sonarr_id INTEGER,
+    title TEXT,
+    library TEXT,
+    size_gb REAL DEFAULT 0,
+    added_at TEXT,
+    last_viewed TEXT,
+    created_at TEXT,
+    ends_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_votes_message_id ON votes (message_id);
+CREATE INDEX IF NOT EXISTS idx_votes_plex_rating_key ON votes (plex_rating_key);
+
+CREATE TABLE IF NOT EXISTS voters (
+    vote_key TEXT NOT NULL REFERENCES votes (vote_key) ON DELETE CASCADE,
+    user_id TEXT NOT NULL,
+    choice TEXT NOT NULL CHECK (choice IN ('keep', 'delete')),
+    voted_at TEXT NOT NULL,
+    PRIMARY KEY (vote_key, user_id)
+);
+
+-- Append-only journal of vote mutations (audit trail, outlives the vote itself)
+CREATE TABLE IF NOT EXISTS vote_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    vote_key TEXT NOT NULL,
+    event TEXT NOT NULL,
+    user_id TEXT,
+    detail TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_vote_events_vote_key ON vote_events (vote_key);
+
+-- Resolved votes, kept for /vote_history and its totals
+CREATE TABLE IF NOT EXISTS vote_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    vote_key TEXT NOT NULL,
+    message_id TEXT,
+    media_type TEXT,
+    plex_rating_key TEXT,
+    title TEXT,
+    library TEXT,
+    size_gb REAL DEFAULT 0,
+    outcome TEXT NOT NULL,
+    keep_voters TEXT NOT NULL DEFAULT '[]',
+    delete_voters TEXT NOT NULL DEFAULT '[]',
+    created_at TEXT,
+    ends_at TEXT,
+    resolved_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_vote_history_resolved_at ON vote_history (resolved_at);
+CREATE INDEX IF NOT EXISTS idx_vote_history_outcome ON vote_history (outcome);
+
+-- Every Plex item ever put up for a vote, with when it was last proposed
+CREATE TABLE IF NOT EXISTS proposed_items (
+    plex_rating_key INTEGER PRIMARY KEY,
+    proposed_at TEXT NOT NULL
+);
+"""
+
+
+def _get_conn() -> sqlite3.Connection:
+    """Open the vote database on first use (WAL mode, schema created if missing)."""
+    global _conn, _conn_thread
+    if _conn is None:
+        os.makedirs(os.path.dirname(MEDIA_VOTES_DB_FILE), exist_ok=True)
+        conn = sqlite3.connect(MEDIA_VOTES_DB_FILE)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.executescript(_SCHEMA)
+        _conn = conn
+        _conn_thread = threading.get_ident()
+    return _conn
+
+
+def _read_conn() -> Optional[sqlite3.Connection]:
+    """The shared connection on the bot's thread; elsewhere a per-thread read-only connection
+    (WAL lets it read alongside the writer).
+
+    Worker threads never open the shared connection, so they get None while the database
+    does not exist yet.
+    """
+    owner = _conn_thread if _conn is not None else threading.main_thread().ident
+    if threading.get_ident() == owner:
+        return _get_conn()
+    conn = getattr(_thread_local, "conn", None)
+    if conn is None:
+        if not os.path.exists(MEDIA_VOTES_DB_FILE):
+            return None
+        conn = sqlite3.connect(f"file:{MEDIA_VOTES_DB_FILE}?mode=ro", uri=True)
+        _thread_local.conn = conn
+    return conn
+
+
+def close():
+    """Flush pending changes and close the vote database connection."""
+    global _conn
+    if _conn is not None:
+        flush()
+        _conn.close()
+        _conn = None
+
+
+def _row_to_vote(row: sqlite3.Row, voters: List[sqlite3.Row]) -> dict:
+    vote = {col: row[col] for col in _VOTE_COLUMNS}
+    vote["keep_voters"] = [v["user_id"] for v in voters if v["choice"] == "keep"]
+    vote["delete_voters"] = [v["user_id"] for v in voters if v["choice"] == "delete"]
+    return vote
+
+
+def _log_event(
+    conn: sqlite3.Connection,
+    vote_key: str,
+    event: str,
+    user_id: Optional[str] = None,
+    detail: Optional[str] = None,
+):
+    """Append a record to the vote journal (caller manages the transaction)."""
+    conn.execute(
+        "INSERT INTO vote_events (vote_key, event, user_id, detail, created_at) VALUES (?, ?, ?, ?, ?)",
+        (vote_key, event, user_id, detail, datetime.utcnow().isoformat()),
+    )
+
+
+def _write_vote(conn: sqlite3.Connection, vote_key: str, vote: dict):
+    """Upsert a vote row and sync its voters (caller manages the transaction).
+
+    Only voters that are new or switched sides are written (with voted_at = now), so
+    voted_at keeps when each user's latest choice was written (within one flush interval of the click).
+    """
+    values = [vote.get(col) for col in _VOTE_COLUMNS]
+    values[_VOTE_COLUMNS.index("message_id")] = str(vote.get("message_id") or "")
+    values[_VOTE_COLUMNS.index("channel_id")] = str(vote.get("channel_id") or "")
+    values[_VOTE_COLUMNS.index("size_gb")] = vote.get("size_gb") or 0
+    placeholders = ", ".join("?" for _ in _VOTE_COLUMNS)
+    updates = ", ".join(f"{col} = excluded.{col}" for col in _VOTE_COLUMNS)
+    conn.execute(
+        f"INSERT INTO votes (vote_key, {', '.join(_VOTE_COLUMNS)}) VALUES (?, {placeholders}) "
+        f"ON CONFLICT (vote_key) DO UPDATE SET {updates}",
+        [vote_key, *values],
+    )
+    stored = {
+        row["user_id"]: row["choice"]
+        for row in conn.execute("SELECT user_id, choice FROM voters WHERE vote_key = ?", (vote_key,))
+    }
+    wanted = {}
+    for choice in ("keep", "delete"):
+        for user_id in vote.get(f"{choice}_voters", []):
+            wanted[str(user_id)] = choice
+    conn.executemany(
+        "DELETE FROM voters WHERE vote_key = ? AND user_id = ?",
+        [(vote_key, user_id) for user_id in stored.keys() - wanted.keys()],
+    )
+    now = datetime.utcnow().isoformat()
+    conn.executemany(
+        "INSERT INTO voters (vote_key, user_id, choice, voted_at) VALUES (?, ?, ?, ?) "
+        "ON CONFLICT (vote_key, user_id) DO UPDATE SET choice = excluded.choice, voted_at = excluded.voted_at",
+        [(vote_key, user_id, choice, now) for user_id, choice in wanted.items() if stored.get(user_id) != choice],
+    )
+
+
+def _index_add(vote_key: str, vote: dict):
+    if vote.get("message_id"):
+        _by_message[str(vote["message_id"])] = vote_key
+    if vote.get("plex_rating_key"):
+        _by_rating_key[str(vote["plex_rating_key"])] = vote_key
+
+
+def _index_remove(vote_key: str, vote: dict):
+    if _by_message.get(str(vote.get("message_id"))) == vote_key:
+        del _by_message[str(vote["message_id"])]
+    if _by_rating_key.get(str(vote.get("plex_rating_key"))) == vote_key:
+        del _by_rating_key[str(vote["plex_rating_key"])]
+
+
+def _rebuild_indexes(votes: Dict[str, dict]):
+    _by_message.clear()
+    _by_rating_key.clear()
+    for key, vote in votes.items():
+        _index_add(key, vote)
+
+
+def _ensure_loaded() -> Dict[str, dict]:
+    """Load active votes from the database into memory on first use."""
+    global _votes
+    if _votes is None:
+        conn = _get_conn()
+        voters_by_key: Dict[str, List[sqlite3.Row]] = {}
+        for v in conn.execute("SELECT vote_key, user_id, choice FROM voters ORDER BY voted_at, rowid"):
+            voters_by_key.setdefault(v["vote_key"], []).append(v)
+        votes = {}
+        for row in conn.execute("SELECT * FROM votes"):
+            votes[row["vote_key"]] = _row_to_vote(row, voters_by_key.get(row["vote_key"], []))
+        _rebuild_indexes(votes)
+        _votes = votes
+    return _votes
+
+
+def _copy_vote(vote: dict) -> dict:
+    copy = dict(vote)
+    copy["keep_voters"] = list(vote.get("keep_voters", []))
+    copy["delete_voters"] = list(vote.get("delete_voters", []))
+    return copy
+
+
+def lock_for(vote_key: str) -> asyncio.Lock:
+    """Return the lock serializing clicks, resolution and cancellation of one vote."""
+    lock = _locks.get(vote_key)
+    if lock is None:
+        lock = _locks[vote_key] = asyncio.Lock()
+    return lock
+
+
+def flush():
+    """Write pending voter changes and journal records to disk in one transaction.
+
+    Votes registered but not yet saved are held back until save_new_votes() writes them.
+    """
+    global _pending_events
+    dirty = _dirty - _unsaved
+    events = [event for event in _pending_events if event[0] not in _unsaved]
+    if not dirty and not events:
+        return
+    votes = _ensure_loaded()
+    conn = _get_conn()
+    with conn:
+        for key in dirty:
+            if key in votes:
+                _write_vote(conn, key, votes[key])
+        for event in events:
+            conn.execute(
+                "INSERT INTO vote_events (vote_key, event, user_id, detail, created_at) VALUES (?, ?, ?, ?, ?)",
+                event,
+            )
+    _dirty.difference_update(dirty)
+    _pending_events = [event for event in _pending_events if event[0] in _unsaved]
+
+
+@tasks.loop(seconds=VOTE_FLUSH_INTERVAL_SECONDS)
+async def flush_vote_store():
+    """Write buffered vote clicks to the vote database."""
+    try:
+        flush()
+    except Exception as e:
+        print(f"Error flushing vote store: {e}")
+
+
+def load_votes() -> dict:
+    """Return all active votes as {"votes": {vote_key: vote}} (copies of the in-memory state)."""
+    return {"votes": {key: _copy_vote(vote) for key, vote in _ensure_loaded().items()}}
+
+
+def get_vote(vote_key: str) -> Optional[dict]:
+    """Return a copy of a single active vote or None."""
+    vote = _ensure_loaded().get(vote_key)
+    return _copy_vote(vote) if vote else None
+
+
+def register_vote(vote_key: str, vote: dict):
+    """Make a just-posted vote active in memory so clicks are accepted before save_new_votes() runs."""
+    votes = _ensure_loaded()
+    if vote_key in votes:
+        _index_remove(vote_key, votes[vote_key])
+    votes[vote_key] = _copy_vote(vote)
+    _index_add(vote_key, votes[vote_key])
+    _unsaved.add(vote_key)
+
+
+def save_new_votes(new_votes: Dict[str, dict]):
+    """Write several votes (e.g. a whole round) in one transaction.
+
+    Registered votes are written as they are in memory, including clicks made since they
+    were posted. Their Plex items are recorded as proposed in the same transaction.
+    """
+    global _pending_events
+    votes = _ensure_loaded()
+    merged = {
+        key: votes[key] if key in _unsaved and key in votes else _copy_vote(vote)
+        for key, vote in new_votes.items()
+    }
+    conn = _get_conn()
+    with conn:
+        for vote_key, vote in merged.items():
+            _write_vote(conn, vote_key, vote)
+            if vote_key not in votes or vote_key in _unsaved:
+                _log_event(conn, vote_key, "create", detail=vote.get("title"))
+        # Clicks made before the vote was saved, journaled after its "create"
+        held = [event for event in _pending_events if event[0] in merged]
+        for event in held:
+            conn.execute(
+                "INSERT INTO vote_events (vote_key, event, user_id, detail, created_at) VALUES (?, ?, ?, ?, ?)",
+                event,
+            )
+        _mark_proposed(conn, [v.get("plex_rating_key") for v in merged.values()])
+    _pending_events = [event for event in _pending_events if event[0] not in merged]
+    for vote_key, vote in merged.items():
+        if vote_key in votes:
+            _index_remove(vote_key, votes[vote_key])
+        votes[vote_key] = vote
+        _index_add(vote_key, vote)
+        _dirty.discard(vote_key)
+        _unsaved.discard(vote_key)
+
+
+def unregister_vote(vote_key: str):
+    """Drop a registered vote that could not be posted completely (it was never saved)."""
+    global _pending_events
+    if vote_key in _unsaved and vote_key in _ensure_loaded():
+        _forget(vote_key)
+    _dirty.discard(vote_key)
+    _pending_events = [event for event in _pending_events if event[0] != vote_key]
+
+
+def delete_vote(vote_key: str, event: str = "cancel", detail: Optional[str] = None) -> bool:
+    """Remove a vote (and its voters), journaling why. Returns True if it existed."""
+    votes = _ensure_loaded()
+    if vote_key not in votes:
+        return False
+    flush()
+    conn = _get_conn()
+    with conn:
+        conn.execute("DELETE FROM votes WHERE vote_key = ?", (vote_key,))
+        _log_event(conn, vote_key, event, detail=detail)
+    _forget(vote_key)
+    return True
+
+
+def _forget(vote_key: str):
+    """Drop a deleted vote from memory, its indexes and its lock."""
+    _index_remove(vote_key, _votes.pop(vote_key))
+    _locks.pop(vote_key, None)
+    _unsaved.discard(vote_key)
+
+
+def resolve_vote(vote_key: str, outcome: str) -> bool:
+    """Archive a finished vote with its outcome to vote_history and remove it from the active set."""
+    votes = _ensure_loaded()
+    vote = votes.get(vote_key)
+    if vote is None:
+        return False
+    flush()
+    conn = _get_conn()
+    with conn:
+        conn.execute(
+            "INSERT INTO vote_history (vote_key, message_id, media_type, plex_rating_key, title, library, "
+            "size_gb, outcome, keep_voters, delete_voters, created_at, ends_at, resolved_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                vote_key,
+                str(vote.get("message_id") or ""),
+                vote.get("media_type"),
+                vote.get("plex_rating_key"),
+                vote.get("title"),
+                vote.get("library"),
+                vote.get("size_gb") or 0,
+                outcome,
+                json.dumps(vote.get("keep_voters", [])),
+                json.dumps(vote.get("delete_voters", [])),
+                vote.get("created_at"),
+                vote.get("ends_at"),
+                datetime.utcnow().isoformat(),
+            ),
+        )
+        conn.execute("DELETE FROM votes WHERE vote_key = ?", (vote_key,))
+        _log_event(conn, vote_key, "resolve", detail=outcome)
+    _forget(vote_key)
+    return True
+
+
+def get_vote_history(limit: int = 10, offset: int = 0) -> List[dict]:
+    """Return archived votes, most recently resolved first."""
+    rows = _get_conn().execute(
+        "SELECT * FROM vote_history ORDER BY resolved_at DESC, id DESC LIMIT ? OFFSET ?",
+        (limit, offset),
+    )
+    history = []
+    for r in rows:
+        entry = dict(r)
+        entry["keep_voters"] = json.loads(entry["keep_voters"])
+        entry["delete_voters"] = json.loads(entry["delete_voters"])
+        history.append(entry)
+    return history
+
+
+def get_vote_history_stats() -> dict:
+    """Return totals over all archived votes (count, kept, deleted, space reclaimed, keep rate)."""
+    row = _get_conn().execute(
+        "SELECT COUNT(*) AS total, "
+        "COALESCE(SUM(outcome = 'kept'), 0) AS kept, "
+        "COALESCE(SUM(outcome = 'deleted'), 0) AS deleted, "
+        "COALESCE(SUM(CASE WHEN outcome = 'deleted' THEN size_gb ELSE 0 END), 0) AS reclaimed_gb "
+        "FROM vote_history"
+    ).fetchone()
+    stats = dict(row)
+    stats["keep_rate"] = stats["kept"] / stats["total"] if stats["total"] else 0.0
+    return stats
+
+
+def find_vote_key_by_message(message_id: str) -> Optional[str]:
+    """Return the key of the active vote posted as message_id, if any."""
+    _ensure_loaded()
+    return _by_message.get(str(message_id))
+
+
+def find_vote_key_by_rating_key(plex_rating_key: str) -> Optional[str]:
+    """Return the key of the active vote for a Plex item, if any."""
+    _ensure_loaded()
+    return _by_rating_key.get(str(plex_rating_key))
+
+
+def cast_vote(vote_key: str, user_id: str, choice: str) -> Optional[dict]:
+    """Record (or switch) a user's vote in memory. Returns the updated vote, or None if the vote is gone.
+
+    The change reaches disk on the next flush().
+    """
+    vote = _ensure_loaded().get(vote_key)
+    if vote is None:
+        return None
+    chosen = vote.setdefault(f"{choice}_voters", [])
+    other = vote.setdefault("delete_voters" if choice == "keep" else "keep_voters", [])
+    if user_id not in chosen:
+        switched = user_id in other
+        if switched:
+            other.remove(user_id)
+        chosen.append(user_id)
+        _dirty.add(vote_key)
+        _pending_events.append(
+            (vote_key, "switch" if switched else "cast", user_id, choice, datetime.utcnow().isoformat())
+        )
+    return _copy_vote(vote)
+
+
+def get_vote_events(vote_key: str) -> List[dict]:
+    """Return the journal of a vote, oldest first."""
+    flush()
+    rows = _get_conn().execute(
+        "SELECT event, user_id, detail, created_at FROM vote_events WHERE vote_key = ? ORDER BY id",
+        (vote_key,),
+    )
+    return [dict(r) for r in rows]
+
+
+def compact_journal(retention_days: int) -> int:
+    """Drop journal records of finished votes older than retention_days and checkpoint the WAL.
+
+    Events of still-active votes are always kept. Returns the number of records removed.
+    """
+    flush()
+    conn = _get_conn()
+    cutoff = (datetime.utcnow() - timedelta(days=retention_days)).isoformat()
+    with conn:
+        cur = conn.execute(
+            "DELETE FROM vote_events WHERE created_at < ? "
+            "AND vote_key NOT IN (SELECT vote_key FROM votes)",
+            (cutoff,),
+        )
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    return cur.rowcount
+
+
+def active_rating_keys() -> Set[str]:
+    """Return the Plex rating keys that currently have an active vote."""
+    _ensure_loaded()
+    return set(_by_rating_key)
+
+
+def _rating_key_int(plex_rating_key) -> Optional[int]:
+    try:
+        return int(plex_rating_key)
+    except (TypeError, ValueError):
+        return None
+
+
+def _mark_proposed(conn: sqlite3.Connection, rating_keys):
+    now = datetime.utcnow().isoformat()
+    rows = [(k, now) for k in map(_rating_key_int, rating_keys) if k is not None]
+    conn.executemany(
+        "INSERT INTO proposed_items (plex_rating_key, proposed_at) VALUES (?, ?) "
+        "ON CONFLICT (plex_rating_key) DO UPDATE SET proposed_at = excluded.proposed_at",
+        rows,
+    )
+
+
+def mark_proposed(rating_keys):
+    """Record that the given Plex items were proposed for a vote now."""
+    conn = _get_conn()
+    with conn:
+        _mark_proposed(conn, rating_keys)
+
+
+def was_proposed(plex_rating_key, within_days: int = 0) -> bool:
+    """Return True if the item was already proposed (indexed lookup; safe from worker threads).
+
+    With within_days > 0 only proposals newer than that count, so older items become eligible again.
+    """
+    key = _rating_key_int(plex_rating_key)
+    conn = _read_conn()
+    if key is None or conn is None:
+        return False
+    if within_days > 0:
+        cutoff = (datetime.utcnow() - timedelta(days=within_days)).isoformat()
+        row = conn.execute(
+            "SELECT 1 FROM proposed_items WHERE plex_rating_key = ? AND proposed_at >= ?", (key, cutoff)
+        ).fetchone()
+    else:
+        row = conn.execute(
+            "SELECT 1 FROM proposed_items WHERE plex_rating_key = ?", (key,)
+        ).fetchone()
+    return row is not None
+
+
+def import_legacy_json():
+    """Import votes from the old media_votes.json once, then rename it so it is not re-imported."""
+    if not os.path.exists(MEDIA_VOTES_FILE):
+        return
+    try:
+        with open(MEDIA_VOTES_FILE, "r") as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, IOError) as e:
+        print(f"Error reading legacy vote file: {e}")
+        return
+    global _votes
+    votes = data.get("votes", {})
+    flush()
+    conn = _get_conn()
+    with conn:
+        for key, vote in votes.items():
+            _write_vote(conn, key, vote)
+            _log_event(conn, key, "import", detail=vote.get("title"))
+    _votes = None
+    os.replace(MEDIA_VOTES_FILE, MEDIA_VOTES_FILE + ".imported")
+    print(f"Imported {len(votes)} vote(s) from {MEDIA_VOTES_FILE}")
+
+
+def import_legacy_proposed_json():
+    """Import media_votes_proposed.json once (proposal time unknown, so it is set to now)."""
+    if not os.path.exists(MEDIA_VOTES_PROPOSED_FILE):
+        return
+    try:
+        with open(MEDIA_VOTES_PROPOSED_FILE, "r") as f:
+            keys = json.load(f).get("proposed_rating_keys", [])
+    except (json.JSONDecodeError, IOError) as e:
+        print(f"Error reading legacy proposed file: {e}")
+        return
+    mark_proposed(keys)
+    os.replace(MEDIA_VOTES_PROPOSED_FILE, MEDIA_VOTES_PROPOSED_FILE + ".imported")
+    print(f"Imported {len(keys)} proposed item(s) from {MEDIA_VOTES_PROPOSED_FILE}")